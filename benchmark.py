@@ -0,0 +1,155 @@
+import random, timeit, datetime, networkx, pickle, os, tempfile
+
+from main import EventNode, EventScene, NodeGrid, Schedule, hit_radius, read_project_file, write_project_file
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+
+def random_positions(count):
+    side = (count ** 0.5) * 0.15
+    return {object(): (random.uniform(0, side), random.uniform(0, side)) for _ in range(count)}
+
+def linear_scan(positions, x, y, radius):
+    min_dist = float('inf')
+    closest_node = None
+
+    for node, (nx_pos, ny_pos) in positions.items():
+        dist = (nx_pos - x) ** 2 + (ny_pos - y) ** 2
+        if dist < min_dist:
+            min_dist = dist
+            closest_node = node
+
+    return closest_node if min_dist < radius ** 2 else None
+
+def bench_hit_testing(sizes=(1000, 10000, 100000), queries=200, far_scale=0.05):
+    print("hit-testing: linear scan vs NodeGrid")
+    for count in sizes:
+        positions = random_positions(count)
+        side = (count ** 0.5) * 0.15
+        cases = (
+            ("near", hit_radius(), random.sample(list(positions.values()), queries)),
+            ("far", hit_radius() / far_scale, [(random.uniform(-side, 2 * side), random.uniform(-side, 2 * side)) for _ in range(queries)]),
+        )
+
+        grid = NodeGrid(hit_radius())
+        build_time = timeit.timeit(lambda: grid.rebuild(positions), number=1)
+
+        for zoom, radius, points in cases:
+            for x, y in points:
+                assert linear_scan(positions, x, y, radius) is grid.nearest(x, y, radius)
+
+            scan_time = timeit.timeit(lambda: [linear_scan(positions, x, y, radius) for x, y in points], number=1) / queries
+            grid_time = timeit.timeit(lambda: [grid.nearest(x, y, radius) for x, y in points], number=1) / queries
+
+            print(f"{count:>7} nodes, {zoom} zoom: scan {scan_time * 1e3:8.3f} ms, grid {grid_time * 1e3:8.3f} ms, rebuild {build_time * 1e3:8.1f} ms, x{scan_time / grid_time:.0f}")
+
+def random_plan(count, start):
+    graph = networkx.DiGraph()
+    nodes = [EventNode(f"event {i}", start + datetime.timedelta(days=i * 300 // count)) for i in range(count)]
+    graph.add_nodes_from(nodes)
+
+    for i in range(1, count):
+        graph.add_edge(nodes[max(0, i - random.randint(1, 300))], nodes[i])
+
+    return graph, nodes
+
+def descendant_shift(graph, node, delta):
+    for n in networkx.descendants(graph, node) | {node}:
+        n.date = n.date + delta
+
+def bench_scheduling(sizes=(1000, 10000, 50000)):
+    print("date edit: descendant shift vs Schedule")
+    for count in sizes:
+        graph, nodes = random_plan(count, datetime.date(2025, 1, 1))
+        milestone = nodes[0]
+        day = datetime.timedelta(days=1)
+
+        schedule = Schedule(graph)
+        build_time = timeit.timeit(schedule.build_adjacency, number=1)
+        schedule_time = timeit.timeit(lambda: schedule.reschedule(milestone, milestone.date + day), number=1)
+        shift_time = timeit.timeit(lambda: descendant_shift(graph, milestone, day), number=1)
+
+        print(f"{count:>7} nodes: shift {shift_time * 1e3:8.1f} ms, schedule {schedule_time * 1e3:8.1f} ms, build {build_time * 1e3:8.1f} ms")
+
+def project_data(count):
+    start = datetime.date(2025, 1, 1)
+    graph, nodes = random_plan(count, start)
+    Schedule(graph)
+
+    return {
+        'graph': graph,
+        'positions': {node: (random.uniform(0, 8), random.uniform(-1, 1)) for node in nodes},
+        'filter': [],
+        'project_start': start,
+        'project_end': start + datetime.timedelta(days=365),
+    }
+
+def bench_project_files(sizes=(1000, 10000, 50000)):
+    print("project files: pickle vs binary")
+    with tempfile.TemporaryDirectory() as directory:
+        pickle_path = os.path.join(directory, 'project.pkl')
+        binary_path = os.path.join(directory, 'project.sev')
+
+        for count in sizes:
+            data = project_data(count)
+
+            def save_pickle():
+                with open(pickle_path, 'wb') as f:
+                    pickle.dump(data, f)
+
+            def load_pickle():
+                with open(pickle_path, 'rb') as f:
+                    return pickle.load(f)
+
+            pickle_save = timeit.timeit(save_pickle, number=1)
+            pickle_load = timeit.timeit(load_pickle, number=1)
+            binary_save = timeit.timeit(lambda: write_project_file(binary_path, data), number=1)
+            binary_load = timeit.timeit(lambda: read_project_file(binary_path), number=1)
+            pickle_size = os.path.getsize(pickle_path) / 2 ** 20
+            binary_size = os.path.getsize(binary_path) / 2 ** 20
+
+            print(f"{count:>7} nodes: pickle save {pickle_save * 1e3:7.1f} ms, load {pickle_load * 1e3:7.1f} ms, {pickle_size:6.2f} MB | binary save {binary_save * 1e3:7.1f} ms, load {binary_load * 1e3:7.1f} ms, {binary_size:6.2f} MB")
+
+def overview_scene(count, scale):
+    scene = EventScene()
+    scene.init_scene()
+    figure = Figure(figsize=(16, 10), dpi=100)
+    scene.setup_figure(figure, FigureCanvasAgg(figure))
+    scene.start_entry, scene.end_entry = "01.01.2025", "31.12.2025"
+    scene.set_dates()
+
+    graph, nodes = random_plan(count, datetime.date(2025, 1, 1))
+    scene.reset_model(graph)
+    scene.set_node_positions({node: (scene.calculate_date_x_position(node.date), random.uniform(-2, 2)) for node in nodes})
+    scene.current_scale = scale
+    scene.current_xlim = (-0.5, 8.5)
+    scene.current_ylim = (-2.5, 2.5)
+    return scene
+
+def render_overview(scene):
+    scene.update_display()
+    scene.flush_display()
+    scene.canvas.draw()
+
+def bench_overview_rendering(sizes=(1000, 3000), scales=(0.3, 0.6)):
+    print("zoomed-out overview: full labels vs level of detail")
+    for count in sizes:
+        for scale in scales:
+            scene = overview_scene(count, scale)
+            level = scene.detail_level()
+            lod_time = timeit.timeit(lambda: render_overview(scene), number=1)
+
+            scene = overview_scene(count, scale)
+            scene.detail_level = lambda: 'full'
+            full_time = timeit.timeit(lambda: render_overview(scene), number=1)
+
+            print(f"{count:>7} nodes, scale {scale}: full {full_time * 1e3:8.1f} ms, {level} {lod_time * 1e3:8.1f} ms, x{full_time / lod_time:.0f}")
+
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    bench_hit_testing()
+    bench_scheduling()
+    bench_project_files()
+    bench_overview_rendering()
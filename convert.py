@@ -0,0 +1,15 @@
+import os, sys
+
+from main import read_pickle_project, write_project_file
+
+
+def convert(source, target=None):
+    target = target or os.path.splitext(source)[0] + '.sev'
+    write_project_file(target, read_pickle_project(source))
+    return target
+
+
+
+if __name__ == "__main__":
+    for source in sys.argv[1:]:
+        print(f"{source} -> {convert(source)}")
@@ -1,10 +1,18 @@
-import sys, os, networkx, matplotlib.pyplot, pandas, datetime, pickle
-from PyQt5.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QPushButton, QLabel, QLineEdit, QDialog, QMessageBox, QFileDialog, QCheckBox, QMenu, QListWidget, QDateEdit, QSpinBox, QComboBox, QStyle
-from PyQt5.QtCore import Qt, QPoint
+import sys, os, gc, math, time, heapq, collections, contextlib, csv, bisect, mmap, struct, json, random, argparse, threading, multiprocessing, concurrent.futures, networkx, matplotlib.pyplot, numpy, openpyxl, datetime, pickle
+from PyQt5.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QPushButton, QLabel, QLineEdit, QDialog, QMessageBox, QFileDialog, QCheckBox, QMenu, QListView, QDateEdit, QSpinBox, QComboBox, QStyle
+from PyQt5.QtCore import Qt, QPoint, QTimer, QAbstractListModel, QModelIndex
 from PyQt5.QtGui import QIcon
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_pdf import PdfPages
-from matplotlib.patches import FancyBboxPatch
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import BoxStyle
+from matplotlib.collections import LineCollection, PolyCollection, PathCollection
+from matplotlib.text import Text
+from matplotlib.path import Path
+from matplotlib.colors import to_rgba
+from matplotlib.transforms import IdentityTransform
+from openpyxl.cell import WriteOnlyCell
 
 
 
@@ -14,7 +22,7 @@ class EventNode:
         if category == '':
             category = nocategory()
 
-        self.id = id(self)
+        self.id = random.getrandbits(63)
         self.name = name
         self.date = date
         self.category = category
@@ -35,36 +43,2125 @@ class EventNode:
 
 
 
-class EventTreeApp(QMainWindow):
+# node spatial index
+class NodeGrid:
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.node_cells = {}
+        self.bounds = None
+
+    def cell_of(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, node, x, y):
+        self.place(node, x, y, self.cell_of(x, y))
+
+    def insert_many(self, nodes, xs, ys):
+        columns = numpy.floor(xs / self.cell_size).astype(numpy.int64).tolist()
+        rows = numpy.floor(ys / self.cell_size).astype(numpy.int64).tolist()
+        for node, x, y, key in zip(nodes, xs.tolist(), ys.tolist(), zip(columns, rows)):
+            self.place(node, x, y, key)
+
+    def place(self, node, x, y, key):
+        previous_key = self.node_cells.get(node)
+
+        if previous_key is not None and previous_key != key:
+            self.remove(node)
+
+        cell = self.cells.get(key)
+        if cell is None:
+            cell = self.cells[key] = {}
+            self.extend_bounds(key)
+
+        cell[node] = (x, y)
+        self.node_cells[node] = key
+
+    def extend_bounds(self, key):
+        i, j = key
+        if self.bounds is None:
+            self.bounds = (i, j, i, j)
+        else:
+            i0, j0, i1, j1 = self.bounds
+            self.bounds = (min(i0, i), min(j0, j), max(i1, i), max(j1, j))
+
+    def remove(self, node):
+        key = self.node_cells.pop(node, None)
+        if key is None:
+            return
+
+        cell = self.cells[key]
+        del cell[node]
+        if not cell:
+            del self.cells[key]
+
+    def rebuild(self, positions):
+        self.cells = {}
+        self.node_cells = {}
+        self.bounds = None
+        for node, (x, y) in positions.items():
+            self.insert(node, x, y)
+
+    def nearest(self, x, y, radius):
+        if self.bounds is None:
+            return None
+
+        x0, y0 = self.cell_of(x - radius, y - radius)
+        x1, y1 = self.cell_of(x + radius, y + radius)
+        x0, y0 = max(x0, self.bounds[0]), max(y0, self.bounds[1])
+        x1, y1 = min(x1, self.bounds[2]), min(y1, self.bounds[3])
+        if x0 > x1 or y0 > y1:
+            return None
+
+        min_dist = radius * radius
+        closest_node = None
+
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self.cells):
+            for (i, j), cell in self.cells.items():
+                if i < x0 or i > x1 or j < y0 or j > y1:
+                    continue
+
+                for node, (nx_pos, ny_pos) in cell.items():
+                    dist = (nx_pos - x) ** 2 + (ny_pos - y) ** 2
+                    if dist < min_dist:
+                        min_dist = dist
+                        closest_node = node
+
+            return closest_node
+
+        row = y / self.cell_size - 0.5
+        for j in sorted(range(y0, y1 + 1), key=lambda j: abs(j - row)):
+            gap = max(0, abs(j - row) - 0.5) * self.cell_size
+            if gap * gap >= min_dist:
+                break
+
+            reach = math.sqrt(min_dist - gap * gap)
+            for i in range(max(x0, math.floor((x - reach) / self.cell_size)), min(x1, math.floor((x + reach) / self.cell_size)) + 1):
+                cell = self.cells.get((i, j))
+                if not cell:
+                    continue
+
+                for node, (nx_pos, ny_pos) in cell.items():
+                    dist = (nx_pos - x) ** 2 + (ny_pos - y) ** 2
+                    if dist < min_dist:
+                        min_dist = dist
+                        closest_node = node
+
+        return closest_node
+
+    def within(self, x0, y0, x1, y1):
+        cx0, cy0 = self.cell_of(x0, y0)
+        cx1, cy1 = self.cell_of(x1, y1)
+        for i in range(cx0, cx1 + 1):
+            for j in range(cy0, cy1 + 1):
+                cell = self.cells.get((i, j))
+                if cell:
+                    yield from cell.items()
+
+
+
+# category to node sets
+class CategoryIndex:
+    def __init__(self, graph):
+        self.nodes = {}
+        self.version = 0
+        for node in graph.nodes:
+            self.add(node)
+
+    def add(self, node):
+        self.nodes.setdefault(node.category, set()).add(node)
+        self.version += 1
+
+    def remove(self, node):
+        nodes = self.nodes.get(node.category)
+        if nodes is None or node not in nodes:
+            return
+
+        nodes.discard(node)
+        if not nodes:
+            del self.nodes[node.category]
+        self.version += 1
+
+    def union(self, categories):
+        return frozenset().union(*(self.nodes.get(category, ()) for category in categories))
+
+    def counts(self):
+        return {category: len(nodes) for category, nodes in self.nodes.items()}
+
+
+
+# viewport x index
+class ViewIndex:
+    def __init__(self, bucket_width):
+        self.bucket_width = bucket_width
+        self.buckets = {}
+        self.keys = []
+        self.spans = {}
+
+    def bucket_of(self, x):
+        return math.floor(x / self.bucket_width)
+
+    def insert(self, item, x1, x2):
+        self.place(item, (self.bucket_of(x1), self.bucket_of(x2)))
+
+    def insert_many(self, items, x1, x2):
+        firsts = numpy.floor(x1 / self.bucket_width).astype(numpy.int64).tolist()
+        lasts = numpy.floor(x2 / self.bucket_width).astype(numpy.int64).tolist()
+        return [item for item, span in zip(items, zip(firsts, lasts)) if self.place(item, span)]
+
+    def place(self, item, span):
+        previous_span = self.spans.get(item)
+
+        if previous_span == span:
+            return False
+        if previous_span is not None:
+            self.remove(item)
+
+        for key in range(span[0], span[1] + 1):
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = set()
+                bisect.insort(self.keys, key)
+            bucket.add(item)
+
+        self.spans[item] = span
+        return True
+
+    def remove(self, item):
+        span = self.spans.pop(item, None)
+        if span is None:
+            return
+
+        for key in range(span[0], span[1] + 1):
+            bucket = self.buckets[key]
+            bucket.discard(item)
+            if not bucket:
+                del self.buckets[key]
+                del self.keys[bisect.bisect_left(self.keys, key)]
+
+    def clear(self):
+        self.buckets = {}
+        self.keys = []
+        self.spans = {}
+
+    def query(self, x1, x2):
+        first = bisect.bisect_left(self.keys, self.bucket_of(x1))
+        last = bisect.bisect_right(self.keys, self.bucket_of(x2))
+
+        items = set()
+        for key in self.keys[first:last]:
+            items.update(self.buckets[key])
+        return items
+
+
+
+# label collision index
+class LabelGrid:
     def __init__(self):
-        super().__init__()
-        self.setWindowTitle("SmartEvent")
-        self.setWindowIcon(icon())
-        self.setMinimumSize(1500, 1500)
+        self.reset(1, 1)
+
+    def reset(self, cell_width, cell_height):
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.cells = {}
+        self.rects = {}
+        self.claim_cells = {}
+        self.claims = {}
+        self.priorities = {}
+
+    def cells_of(self, x0, y0, x1, y1):
+        return [(i, j) for i in range(math.floor(x0 / self.cell_width), math.floor(x1 / self.cell_width) + 1)
+                for j in range(math.floor(y0 / self.cell_height), math.floor(y1 / self.cell_height) + 1)]
+
+    def overlapping(self, cells, rects, x0, y0, x1, y1):
+        for cell in self.cells_of(x0, y0, x1, y1):
+            for other in cells.get(cell, ()):
+                ox0, oy0, ox1, oy1 = rects[other]
+                if x0 < ox1 and ox0 < x1 and y0 < oy1 and oy0 < y1:
+                    yield other
+
+    def fits(self, priority, x0, y0, x1, y1):
+        return all(self.priorities[other] > priority for other in self.overlapping(self.cells, self.rects, x0, y0, x1, y1))
+
+    def claim(self, node, priority, claim, rect):
+        self.priorities[node] = priority
+        self.insert(self.claim_cells, self.claims, node, claim)
+        if rect is None:
+            return []
+
+        self.insert(self.cells, self.rects, node, rect)
+        return list({other for other in self.overlapping(self.claim_cells, self.claims, *rect) if other in self.rects and self.priorities[other] > priority})
+
+    def release(self, node):
+        rect = self.discard(self.cells, self.rects, node)
+        self.discard(self.claim_cells, self.claims, node)
+        self.priorities.pop(node, None)
+        if rect is None:
+            return []
+        return list({other for other in self.overlapping(self.claim_cells, self.claims, *rect) if other not in self.rects})
+
+    def insert(self, cells, rects, node, rect):
+        self.discard(cells, rects, node)
+        rects[node] = rect
+        for cell in self.cells_of(*rect):
+            cells.setdefault(cell, set()).add(node)
+
+    def discard(self, cells, rects, node):
+        rect = rects.pop(node, None)
+        if rect is None:
+            return None
+
+        for cell in self.cells_of(*rect):
+            nodes = cells[cell]
+            nodes.discard(node)
+            if not nodes:
+                del cells[cell]
+        return rect
+
+
+
+# datetime64 calendar columns
+class Calendar:
+    def __init__(self, start, end, granularity):
+        self.granularity = granularity
+        start, end = numpy.datetime64(start, 'D'), numpy.datetime64(end, 'D')
+
+        if granularity == 'month':
+            months = numpy.arange(start.astype('datetime64[M]'), end.astype('datetime64[M]') + 1)
+            self.starts = months.astype('datetime64[D]')
+            self.ends = numpy.minimum((months + 1).astype('datetime64[D]') - 1, end)
+        else:
+            step = 7 if granularity == 'week' else 1
+            origin = start - (start.astype(numpy.int64) + 3) % step
+            self.starts = numpy.arange(origin, end + 1, step)
+            self.ends = numpy.minimum(self.starts + (step - 1), end)
+
+        self.origin = self.starts[0]
+
+    def __len__(self):
+        return len(self.starts)
+
+    def columns(self, dates):
+        dates = numpy.asarray(dates, dtype='datetime64[D]')
+        if self.granularity == 'month':
+            months = dates.astype('datetime64[M]')
+            first = months.astype('datetime64[D]')
+            days = ((months + 1).astype('datetime64[D]') - first).astype(numpy.int64)
+            return (months - self.origin.astype('datetime64[M]')).astype(numpy.int64) + (dates - first).astype(numpy.int64) / days
+
+        days = (dates - self.origin).astype(numpy.int64)
+        return days / 7 if self.granularity == 'week' else days.astype(numpy.float64)
+
+    def label(self, column):
+        return self.starts[column].item().strftime('%m\n%Y' if self.granularity == 'month' else '%d\n%m')
+
+    def span(self, first, count):
+        first = min(max(first, 0), len(self) - 1)
+        return self.starts[first].item(), self.ends[min(first + count, len(self)) - 1].item()
+
+
+
+# cached edge routes and detours
+class EdgeRouteCache:
+    def __init__(self):
+        self.routes = {}
+        self.waypoints = {}
+        self.edges_by_node = {}
+        self.extents = {}
+        self.sizes = {}
+        self.reach = (0, 0)
+        self.reference = None
+
+    def route(self, edge, key):
+        cached = self.routes.get(edge)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        return None
+
+    def set_route(self, edge, key, route):
+        self.routes[edge] = (key, route)
+        self.track(edge)
+
+    def set_waypoints(self, edge, key, waypoints):
+        self.waypoints[edge] = (key, waypoints)
+        self.track(edge)
+
+    def track(self, edge):
+        for node in edge:
+            self.edges_by_node.setdefault(node, set()).add(edge)
+
+    def measure(self, reference, nodes, size):
+        if reference != self.reference:
+            self.reference = reference
+            self.waypoints = {}
+            self.sizes = {}
+            self.reach = (0, 0)
+
+        for node in nodes:
+            if node not in self.sizes:
+                self.sizes[node] = size(node)
+                self.reach = (max(self.reach[0], self.sizes[node][0]), max(self.reach[1], self.sizes[node][1]))
+
+    def invalidate(self, nodes):
+        for node in nodes:
+            self.extents.pop(node, None)
+            self.sizes.pop(node, None)
+            for edge in self.edges_by_node.pop(node, ()):
+                self.routes.pop(edge, None)
+                self.waypoints.pop(edge, None)
+                for other in edge:
+                    if other is not node and other in self.edges_by_node:
+                        self.edges_by_node[other].discard(edge)
+
+
+
+# cached ancestor / descendant sets
+class ReachabilityIndex:
+    def __init__(self, graph):
+        self.graph = graph
+        self.descendant_cache = {}
+        self.ancestor_cache = {}
+
+    def descendants(self, node):
+        if node not in self.descendant_cache:
+            self.descendant_cache[node] = self.walk(node, self.graph.successors, self.descendant_cache)
+        return self.descendant_cache[node]
+
+    def ancestors(self, node):
+        if node not in self.ancestor_cache:
+            self.ancestor_cache[node] = self.walk(node, self.graph.predecessors, self.ancestor_cache)
+        return self.ancestor_cache[node]
+
+    def walk(self, node, neighbors, cache):
+        reached = set()
+        stack = [node]
+
+        while stack:
+            for neighbor in neighbors(stack.pop()):
+                if neighbor in reached:
+                    continue
+
+                reached.add(neighbor)
+                if neighbor in cache:
+                    reached |= cache[neighbor]
+                else:
+                    stack.append(neighbor)
+
+        return reached
+
+    def add_edge(self, source, target):
+        affected = [node for node, reached in self.descendant_cache.items() if node == source or source in reached]
+        if affected:
+            gained = self.descendants(target) | {target}
+            for node in affected:
+                self.descendant_cache[node] |= gained
+
+        affected = [node for node, reached in self.ancestor_cache.items() if node == target or target in reached]
+        if affected:
+            gained = self.ancestors(source) | {source}
+            for node in affected:
+                self.ancestor_cache[node] |= gained
+
+    def remove_node(self, node):
+        for cache in (self.descendant_cache, self.ancestor_cache):
+            for stale in [n for n, reached in cache.items() if n == node or node in reached]:
+                del cache[stale]
+
+
+
+# online topological order (Pearce-Kelly)
+class TopologicalOrder:
+    def __init__(self, graph):
+        self.graph = graph
+
+        try:
+            nodes = list(networkx.topological_sort(graph))
+        except networkx.NetworkXUnfeasible:
+            condensed = networkx.condensation(graph)
+            nodes = [node for component in networkx.topological_sort(condensed) for node in condensed.nodes[component]['members']]
+
+        self.order = {node: i for i, node in enumerate(nodes)}
+        self.next_index = len(nodes)
+
+    def add_node(self, node):
+        if node not in self.order:
+            self.order[node] = self.next_index
+            self.next_index += 1
+
+    def remove_node(self, node):
+        self.order.pop(node, None)
+
+    def add_edge(self, source, target):
+        if source == target:
+            return False
+
+        lower = self.order[target]
+        upper = self.order[source]
+        if lower > upper:
+            return True
+
+        forward = {target}
+        stack = [target]
+        while stack:
+            for successor in self.graph.successors(stack.pop()):
+                if successor == source:
+                    return False
+                if successor not in forward and self.order[successor] < upper:
+                    forward.add(successor)
+                    stack.append(successor)
+
+        backward = {source}
+        stack = [source]
+        while stack:
+            for predecessor in self.graph.predecessors(stack.pop()):
+                if predecessor not in backward and self.order[predecessor] > lower:
+                    backward.add(predecessor)
+                    stack.append(predecessor)
+
+        nodes = sorted(backward, key=self.order.get) + sorted(forward, key=self.order.get)
+        slots = sorted(self.order[node] for node in nodes)
+        for node, slot in zip(nodes, slots):
+            self.order[node] = slot
+
+        return True
+
+
+
+# event dates with earliest start propagation
+class Schedule:
+    def __init__(self, graph):
+        self.graph = graph
+        self.rows = {}
+        self.nodes = []
+        self.dates = numpy.empty(max(len(graph), 16), dtype='datetime64[D]')
+        self.earliest = numpy.zeros(len(self.dates), dtype=numpy.int64)
+        self.latest = numpy.zeros(len(self.dates), dtype=numpy.int64)
+        self.adjacency = None
+
+        for node in graph.nodes:
+            self.add_node(node)
+
+        for source, target, data in graph.edges(data=True):
+            if 'lag' not in data:
+                self.add_edge(source, target)
+
+    def add_node(self, node):
+        if node in self.rows:
+            return
+
+        if len(self.nodes) == len(self.dates):
+            self.dates, self.earliest, self.latest = (numpy.concatenate((column, numpy.empty_like(column))) for column in (self.dates, self.earliest, self.latest))
+
+        row = self.rows[node] = len(self.nodes)
+        self.nodes.append(node)
+        self.dates[row] = node.date
+        self.earliest[row] = self.latest[row] = self.dates[row].astype(numpy.int64)
+
+        if self.adjacency is not None:
+            predecessor_index, predecessor_rows, lags, successor_index, successor_rows, successor_edges = self.adjacency
+            self.adjacency = (numpy.append(predecessor_index, predecessor_index[-1]), predecessor_rows, lags,
+                              numpy.append(successor_index, successor_index[-1]), successor_rows, successor_edges)
+
+    def remove_node(self, node):
+        row = self.rows.pop(node, None)
+        if row is None:
+            return
+
+        last_row = len(self.nodes) - 1
+        last_node = self.nodes.pop()
+        if last_node is not node:
+            self.nodes[row] = last_node
+            for column in (self.dates, self.earliest, self.latest):
+                column[row] = column[last_row]
+            self.rows[last_node] = row
+
+        if self.adjacency is not None:
+            predecessor_index, predecessor_rows, lags = self.adjacency[:3]
+            targets = numpy.repeat(numpy.arange(len(predecessor_index) - 1), numpy.diff(predecessor_index))
+            kept = (targets != row) & (predecessor_rows != row)
+            sources, targets = predecessor_rows[kept], targets[kept]
+            sources[sources == last_row] = row
+            targets[targets == last_row] = row
+            self.adjacency = self.compress(sources, targets, lags[kept], last_row)
+
+    def add_edge(self, source, target):
+        lag = self.graph.edges[source, target]['lag'] = (target.date - source.date).days
+        if self.adjacency is None:
+            return
 
+        predecessor_index, predecessor_rows, lags, successor_index, successor_rows, successor_edges = self.adjacency
+        source_row, target_row = self.rows[source], self.rows[target]
+        position = predecessor_index[target_row + 1]
+
+        incoming = numpy.flatnonzero(predecessor_rows[predecessor_index[target_row]:position] == source_row)
+        if incoming.size:
+            lags[predecessor_index[target_row] + incoming[0]] = lag
+            return
+
+        slot = successor_index[source_row + 1]
+        self.adjacency = (
+            numpy.concatenate((predecessor_index[:target_row + 1], predecessor_index[target_row + 1:] + 1)),
+            numpy.insert(predecessor_rows, position, source_row),
+            numpy.insert(lags, position, lag),
+            numpy.concatenate((successor_index[:source_row + 1], successor_index[source_row + 1:] + 1)),
+            numpy.insert(successor_rows, slot, target_row),
+            numpy.insert(successor_edges + (successor_edges >= position), slot, position),
+        )
+
+    def build_adjacency(self):
+        edges = numpy.array([(self.rows[source], self.rows[target], lag) for source, target, lag in self.graph.edges(data='lag')], dtype=numpy.int64).reshape(-1, 3)
+        sources, targets, lags = edges.T
+        self.adjacency = self.compress(sources, targets, lags, len(self.nodes))
+
+    def compress(self, sources, targets, lags, count):
+        by_target = numpy.argsort(targets, kind='stable')
+        by_source = numpy.argsort(sources, kind='stable')
+        positions = numpy.empty(len(targets), dtype=numpy.int64)
+        positions[by_target] = numpy.arange(len(targets))
+        return (
+            numpy.concatenate(([0], numpy.cumsum(numpy.bincount(targets, minlength=count)))),
+            sources[by_target],
+            lags[by_target],
+            numpy.concatenate(([0], numpy.cumsum(numpy.bincount(sources, minlength=count)))),
+            targets[by_source],
+            positions[by_source],
+        )
+
+    def compressed(self):
+        if self.adjacency is None:
+            self.build_adjacency()
+        return self.adjacency
+
+    def days(self):
+        return self.dates[:len(self.nodes)].view(numpy.int64)
+
+    def rows_of(self, nodes):
+        return numpy.array([self.rows[node] for node in nodes if node in self.rows], dtype=numpy.int64)
+
+    def reschedule(self, node, date):
+        predecessor_index, predecessor_rows, lags, successor_index, successor_rows = self.compressed()[:5]
+        days = self.days()
+        row = self.rows[node]
+        days[row] = numpy.datetime64(date, 'D').astype(numpy.int64)
+
+        for predecessor, data in self.graph.pred[node].items():
+            data['lag'] = int(days[row] - days[self.rows[predecessor]])
+        incoming = slice(predecessor_index[row], predecessor_index[row + 1])
+        lags[incoming] = days[row] - days[predecessor_rows[incoming]]
+
+        frontier = numpy.array([row])
+        changed = [frontier]
+        while frontier.size:
+            targets = numpy.unique(successor_rows[adjacency_slices(successor_index, frontier)[0]])
+            edges, counts = adjacency_slices(predecessor_index, targets)
+            earliest = numpy.maximum.reduceat(days[predecessor_rows[edges]] + lags[edges], numpy.cumsum(counts) - counts) if targets.size else targets
+            moved = earliest != days[targets]
+            frontier = targets[moved]
+            days[frontier] = earliest[moved]
+            changed.append(frontier)
+
+        changed = numpy.unique(numpy.concatenate(changed))
+        nodes = [self.nodes[i] for i in changed.tolist()]
+        dates = self.dates[changed]
+        for n, n_date in zip(nodes, dates.tolist()):
+            n.date = n_date
+
+        return nodes, dates
+
+
+
+# critical path analysis
+class CriticalPath:
+    def __init__(self, graph, schedule):
+        self.graph = graph
+        self.schedule = schedule
+        self.finish = None
+        self.downstream = set()
+        self.upstream = set()
+
+        self.propagate(numpy.arange(len(schedule.nodes)), schedule.earliest, self.earliest_of, True)
+        self.rebuild_latest()
+
+    def earliest_of(self, rows):
+        predecessor_index, predecessor_rows, lags = self.schedule.compressed()[:3]
+        edges, counts = adjacency_slices(predecessor_index, rows)
+        values = self.schedule.days()[rows]
+        linked = counts > 0
+        if edges.size:
+            values[linked] = numpy.maximum.reduceat(self.schedule.earliest[predecessor_rows[edges]] + lags[edges], (numpy.cumsum(counts) - counts)[linked])
+        return values
+
+    def latest_of(self, rows):
+        lags, successor_index, successor_rows, successor_edges = self.schedule.compressed()[2:]
+        edges, counts = adjacency_slices(successor_index, rows)
+        values = numpy.full(len(rows), self.finish, dtype=numpy.int64)
+        linked = counts > 0
+        if edges.size:
+            values[linked] = numpy.minimum.reduceat(self.schedule.latest[successor_rows[edges]] - lags[successor_edges[edges]], (numpy.cumsum(counts) - counts)[linked])
+        return values
+
+    def rebuild_latest(self):
+        earliest = self.schedule.earliest[:len(self.schedule.nodes)]
+        self.finish = int(earliest.max()) if earliest.size else None
+        self.propagate(numpy.arange(len(self.schedule.nodes)), self.schedule.latest, self.latest_of, False)
+
+    def defer(self, downstream=(), upstream=()):
+        self.downstream.update(downstream)
+        self.upstream.update(upstream)
+
+    def update(self, downstream=(), upstream=()):
+        self.defer(downstream, upstream)
+        downstream, upstream = self.downstream, self.upstream
+        self.downstream, self.upstream = set(), set()
+        changed = self.propagate(self.schedule.rows_of(downstream), self.schedule.earliest, self.earliest_of, True)
+
+        earliest = self.schedule.earliest[:len(self.schedule.nodes)]
+        if (int(earliest.max()) if earliest.size else None) != self.finish:
+            self.rebuild_latest()
+            return None
+
+        changed = numpy.unique(numpy.concatenate((changed, self.propagate(self.schedule.rows_of(upstream), self.schedule.latest, self.latest_of, False))))
+        return [self.schedule.nodes[row] for row in changed.tolist()]
+
+    def propagate(self, rows, values, compute, forward):
+        adjacency = self.schedule.compressed()
+        index, neighbors = adjacency[3:5] if forward else adjacency[:2]
+        frontier = numpy.unique(rows)
+        changed = [frontier[:0]]
+
+        while frontier.size:
+            computed = compute(frontier)
+            moved = computed != values[frontier]
+            frontier = frontier[moved]
+            values[frontier] = computed[moved]
+            changed.append(frontier)
+            frontier = numpy.unique(neighbors[adjacency_slices(index, frontier)[0]])
+
+        return numpy.concatenate(changed)
+
+    def slack(self, node):
+        row = self.schedule.rows[node]
+        return int(self.schedule.latest[row] - self.schedule.earliest[row])
+
+    def is_critical(self, node):
+        return self.slack(node) == 0
+
+    def is_critical_edge(self, source, target):
+        earliest = self.schedule.earliest
+        return self.is_critical(source) and self.is_critical(target) and earliest[self.schedule.rows[source]] + self.graph.edges[source, target]['lag'] == earliest[self.schedule.rows[target]]
+
+    def columns(self, nodes):
+        self.update()
+        rows = self.schedule.rows_of(nodes)
+        return self.schedule.earliest[rows] + epoch_ordinal(), self.schedule.latest[rows] + epoch_ordinal()
+
+
+
+# week column lanes with barycentric ordering
+class LaneLayout:
+    def __init__(self, graph, layer):
+        self.graph = graph
+        self.layer = layer
+        self.layers = {}
+        self.layer_of = {}
+        self.lanes = {}
+        self.pins = {}
+
+    def build(self, hints):
+        self.layers = {}
+        self.layer_of = {}
+        self.lanes = {}
+        for node in self.graph:
+            layer = self.layer(node)
+            self.layers.setdefault(layer, []).append(node)
+            self.layer_of[node] = layer
+
+        for nodes in self.layers.values():
+            nodes.sort(key=lambda node: hints.get(node, math.inf))
+            self.lanes.update((node, lane) for lane, node in enumerate(nodes))
+
+        self.sweep(sorted(self.layers), layout_sweeps())
+        return dict(self.lanes)
+
+    def update(self, nodes, hints):
+        nodes = set(nodes)
+        affected = set()
+        for node in nodes:
+            if node in self.layer_of and (node not in self.graph or self.layer_of[node] != self.layer(node)):
+                affected.add(self.detach(node))
+            if node not in self.graph:
+                continue
+
+            if node not in self.layer_of:
+                affected.add(self.attach(node, hints.get(node)))
+            affected.add(self.layer_of[node])
+            affected.update(self.layer_of[neighbour] for neighbour in networkx.all_neighbors(self.graph, node) if neighbour in self.layer_of)
+
+        affected = sorted(layer for layer in affected if layer in self.layers)
+        before = {node: self.lanes[node] for layer in affected for node in self.layers[layer]}
+
+        self.pins = {node: lane for node, lane in hints.items() if node in self.lanes}
+        self.sweep(affected, 2)
+        self.pins = {}
+
+        return {node: self.lanes[node] for node, lane in before.items() if self.lanes[node] != lane or node in nodes}
+
+    def attach(self, node, hint):
+        layer = self.layer(node)
+        nodes = self.layers.setdefault(layer, [])
+        lanes = [self.lanes[neighbour] for neighbour in networkx.all_neighbors(self.graph, node) if neighbour in self.lanes]
+
+        if hint is None:
+            hint = sum(lanes) / len(lanes) if lanes else max((self.lanes[n] for n in nodes), default=-1) + 1
+        nodes.append(node)
+        self.layer_of[node] = layer
+        self.lanes[node] = hint
+        return layer
+
+    def detach(self, node):
+        layer = self.layer_of.pop(node)
+        self.layers[layer].remove(node)
+        if not self.layers[layer]:
+            del self.layers[layer]
+        del self.lanes[node]
+        return layer
+
+    def sweep(self, layers, sweeps):
+        for step in range(sweeps):
+            forward = step % 2 == 0
+            for layer in (layers if forward else reversed(layers)):
+                nodes = self.layers[layer]
+                desired = {node: self.barycenter(node, forward) for node in nodes}
+                nodes.sort(key=lambda node: (desired[node], self.lanes[node]))
+                self.lanes.update(zip(nodes, self.compact([desired[node] for node in nodes])))
+
+    def barycenter(self, node, forward):
+        if node in self.pins:
+            return self.pins[node]
+
+        lanes = [self.lanes[n] for n in (self.graph.pred[node] if forward else self.graph.succ[node]) if n in self.lanes]
+        if not lanes:
+            lanes = [self.lanes[n] for n in (self.graph.succ[node] if forward else self.graph.pred[node]) if n in self.lanes]
+        return sum(lanes) / len(lanes) if lanes else self.lanes[node]
+
+    def compact(self, desired):
+        blocks = []
+        for i, lane in enumerate(desired):
+            blocks.append([lane - i, 1])
+            while len(blocks) > 1 and blocks[-2][0] * blocks[-1][1] >= blocks[-1][0] * blocks[-2][1]:
+                total, count = blocks.pop()
+                blocks[-1][0] += total
+                blocks[-1][1] += count
+
+        lanes = []
+        for total, count in blocks:
+            base = math.floor(total / count + 0.5)
+            for _ in range(count):
+                lanes.append(base + len(lanes))
+        return lanes
+
+
+
+# append-only edit journal
+class Journal:
+    def __init__(self, path, sequence):
+        self.path = journal_path(path)
+        self.compacting_path = compacting_journal_path(path)
+        self.sequence = sequence
+        self.records = 0
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+        if self.file.tell():
+            with open(self.path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read() != b'\n':
+                    self.file.write('\n')
+
+    def append(self, operation, *values):
+        self.sequence += 1
+        self.records += 1
+        self.file.write(json.dumps([self.sequence, operation, *values], ensure_ascii=False) + '\n')
+        self.file.flush()
+
+    def rotate(self):
+        self.file.close()
+        with open(self.path, encoding='utf-8') as source, open(self.compacting_path, 'a', encoding='utf-8') as target:
+            target.write(source.read())
+
+        self.file = open(self.path, 'w', encoding='utf-8')
+        self.records = 0
+
+    def reset(self):
+        self.file.close()
+        if os.path.exists(self.compacting_path):
+            os.remove(self.compacting_path)
+
+        self.file = open(self.path, 'w', encoding='utf-8')
+        self.records = 0
+
+    def close(self):
+        self.file.close()
+
+
+
+# frame timing ring buffer
+class FrameProfiler:
+    def __init__(self, capacity):
+        self.frames = collections.deque(maxlen=capacity)
+        self.phases = {}
+        self.busy = 0.0
+        self.depth = 0
+
+    def start(self):
+        self.depth += 1
+        return time.perf_counter()
+
+    def stop(self, phase, start):
+        duration = (time.perf_counter() - start) * 1000
+        self.depth = max(0, self.depth - 1)
+        self.phases[phase] = self.phases.get(phase, 0.0) + duration
+        if self.depth == 0:
+            self.busy += duration
+
+    @contextlib.contextmanager
+    def measure(self, phase):
+        start = self.start()
+        try:
+            yield
+        finally:
+            self.stop(phase, start)
+
+    def end_frame(self, artists):
+        self.frames.append((time.perf_counter(), time.time(), self.busy, artists, self.phases))
+        self.phases = {}
+        self.busy = 0.0
+        self.depth = 0
+
+    def fps(self):
+        if not self.frames:
+            return 0.0
+
+        last = self.frames[-1][0]
+        count = 0
+        for frame in reversed(self.frames):
+            if last - frame[0] >= 1.0:
+                break
+            count += 1
+        return float(count)
+
+    def summary(self):
+        if not self.frames:
+            return "Нет замеров"
+
+        _, _, busy, artists, phases = self.frames[-1]
+        lines = [f"FPS {self.fps():.0f}   кадр {busy:.1f} мс   артистов {artists}"]
+        for phase, duration in sorted(phases.items(), key=lambda item: -item[1]):
+            lines.append(f"{phase:<14}{duration:8.1f} мс")
+        return '\n'.join(lines)
+
+
+
+# retained node artists
+class SceneNode:
+    def __init__(self, ax):
+        self.text = ax.text(0, 0, '', ha='center', va='center', color='black')
+        self.path = None
+
+        self.label = None
+        self.fontsize = None
+        self.extent = (0, 0)
+        self.key = None
+
+    def update(self, x, y, label, fontsize, extent, units):
+        if label != self.label or fontsize != self.fontsize:
+            self.label = label
+            self.fontsize = fontsize
+            self.text.set_text(label)
+            self.text.set_fontsize(fontsize)
+
+        self.extent = extent
+        key = (x, y, self.extent, units)
+        if key == self.key:
+            return
+
+        self.key = key
+        boxwidth = self.extent[0] * units[0]
+        boxheight = self.extent[1] * units[1]
+
+        self.text.set_position((x, y))
+        self.path = BoxStyle.Round(pad=0.01)(x - boxwidth / 2, y - boxheight / 2, boxwidth, boxheight, 1)
+
+    def remove(self):
+        self.text.remove()
+
+
+
+# batched node boxes
+class NodeBoxes:
+    def __init__(self, ax, animated=False):
+        self.collection = self.create_collection(ax, animated)
+        ax.add_collection(self.collection, autolim=False)
+
+        self.nodes = []
+        self.index = {}
+        self.paths = []
+        self.colors = []
+        self.rgba = numpy.empty((16, 4))
+        self.resized = False
+        self.changed = set()
+
+    def __contains__(self, node):
+        return node in self.index
+
+    def set(self, node, path, color):
+        i = self.index.get(node)
+
+        if i is None:
+            i = self.index[node] = len(self.nodes)
+            if i == len(self.rgba):
+                self.rgba = numpy.concatenate((self.rgba, numpy.empty_like(self.rgba)))
+            self.nodes.append(node)
+            self.paths.append(path)
+            self.colors.append(color)
+            self.rgba[i] = to_rgba(color, self.collection.get_alpha())
+            self.resized = True
+            return
+
+        if self.paths[i] is not path:
+            self.paths[i] = path
+            self.changed.add(i)
+
+        if self.colors[i] != color:
+            self.colors[i] = color
+            self.rgba[i] = to_rgba(color, self.collection.get_alpha())
+            self.changed.add(i)
+
+    def remove(self, node):
+        i = self.index.pop(node, None)
+        if i is None:
+            return
+
+        last_node = self.nodes.pop()
+        last_path = self.paths.pop()
+        last_color = self.colors.pop()
+
+        if last_node is not node:
+            self.nodes[i] = last_node
+            self.paths[i] = last_path
+            self.colors[i] = last_color
+            self.rgba[i] = self.rgba[len(self.nodes)]
+            self.index[last_node] = i
+
+        self.resized = True
+
+    def flush(self):
+        if self.resized:
+            self.set_paths(self.paths)
+            self.collection.set_facecolor(self.rgba[:len(self.nodes)])
+        elif self.changed:
+            rows = list(self.changed)
+            self.patch_paths(rows)
+            self.collection.get_facecolor()[rows] = self.rgba[rows]
+            self.collection.stale = True
+
+        self.resized = False
+        self.changed = set()
+
+    def create_collection(self, ax, animated):
+        return PathCollection([], edgecolors='black', linewidths=1, alpha=0.8, zorder=1, animated=animated)
+
+    def set_paths(self, paths):
+        self.collection.set_paths(paths)
+
+    def patch_paths(self, rows):
+        pass
+
+
+
+# batched far-zoom node dots
+class NodeDots(NodeBoxes):
+    def create_collection(self, ax, animated):
+        return PathCollection([Path.unit_circle()], sizes=[node_dot_size()], offsets=numpy.empty((0, 2)), offset_transform=ax.transData,
+                              transform=IdentityTransform(), edgecolors='none', zorder=2, animated=animated)
+
+    def set_paths(self, offsets):
+        self.collection.set_offsets(numpy.array(offsets, dtype=float).reshape(-1, 2))
+
+    def patch_paths(self, rows):
+        self.collection.get_offsets()[rows] = [self.paths[i] for i in rows]
+
+
+
+# batched edge lines and arrow heads
+class EdgeLines:
+    def __init__(self, ax, animated=False):
+        self.lines = ax.add_collection(LineCollection([], colors='gray', zorder=2, animated=animated), autolim=False)
+        self.heads = ax.add_collection(PolyCollection([], facecolors='gray', edgecolors='gray', zorder=2, animated=animated), autolim=False)
+
+        self.edges = []
+        self.index = {}
+        self.routes = []
+        self.colors = []
+        self.line_paths = self.lines.get_paths()
+        self.head_paths = self.heads.get_paths()
+        self.rgba = numpy.empty((16, 4))
+        self.resized = False
+        self.changed = set()
+
+    def __contains__(self, edge):
+        return edge in self.index
+
+    def set(self, edge, route, color):
+        i = self.index.get(edge)
+
+        if i is None:
+            i = self.index[edge] = len(self.edges)
+            if i == len(self.rgba):
+                self.rgba = numpy.concatenate((self.rgba, numpy.empty_like(self.rgba)))
+            self.edges.append(edge)
+            self.routes.append(route)
+            self.colors.append(color)
+            self.line_paths.append(line_path(route[0]))
+            self.head_paths.append(head_path(route[1]))
+            self.rgba[i] = to_rgba(color)
+            self.resized = True
+            return
+
+        if self.routes[i] is not route:
+            self.routes[i] = route
+            self.line_paths[i] = line_path(route[0])
+            self.head_paths[i] = head_path(route[1])
+            self.changed.add(i)
+
+        if self.colors[i] != color:
+            self.colors[i] = color
+            self.rgba[i] = to_rgba(color)
+            self.changed.add(i)
+
+    def remove(self, edge):
+        i = self.index.pop(edge, None)
+        if i is None:
+            return
+
+        last_edge = self.edges.pop()
+        last_route = self.routes.pop()
+        last_color = self.colors.pop()
+        last_line = self.line_paths.pop()
+        last_head = self.head_paths.pop()
+
+        if last_edge != edge:
+            self.edges[i] = last_edge
+            self.routes[i] = last_route
+            self.colors[i] = last_color
+            self.line_paths[i] = last_line
+            self.head_paths[i] = last_head
+            self.rgba[i] = self.rgba[len(self.edges)]
+            self.index[last_edge] = i
+
+        self.resized = True
+
+    def recolor(self, color_of):
+        for edge, route in zip(self.edges, self.routes):
+            self.set(edge, route, color_of(*edge))
+
+    def flush(self):
+        if self.resized:
+            colors = self.rgba[:len(self.edges)]
+            self.lines.set_color(colors)
+            self.heads.set_facecolor(colors)
+            self.heads.set_edgecolor(colors)
+        elif self.changed:
+            rows = list(self.changed)
+            for colors in (self.lines.get_edgecolor(), self.heads.get_facecolor(), self.heads.get_edgecolor()):
+                colors[rows] = self.rgba[rows]
+
+        if self.resized or self.changed:
+            self.lines.stale = True
+            self.heads.stale = True
+
+        self.resized = False
+        self.changed = set()
+
+
+
+# qt-free model and renderer
+class EventScene:
+    def init_scene(self):
         self.end_entry = ""
         self.start_entry = ""
         self.column_width_base = "8.0"
         self.show_timeline = True
-        self.graph = networkx.DiGraph()
+        self.reset_model(networkx.DiGraph())
         self.current_category_filter = []
+        self.current_node_filter = None
         self.node_positions = {}
+        self.node_grid = NodeGrid(hit_radius())
+        self.view_nodes = ViewIndex(view_bucket_width())
+        self.view_edges = ViewIndex(view_bucket_width())
         self.selected_node = None
         self.dragged_node = None
-        self.pan_mode = False
         self.current_scale = 1.0
         self.current_time_scale = 1
         self.current_week_offset = 0
         self.project_start = None
         self.project_end = None
-        self.week_columns = []
+        self.project_start_calculated = None
+        self.calendar = None
+        self.time_granularity = 'week'
         self.column_width = 2
         self.show_timeline = True
-        self.ctrl_pressed = False
+        self.show_critical_path = False
+        self.avoid_obstacles = False
+        self.show_profile = False
+        self.profiler = FrameProfiler(profile_capacity())
 
         self.current_xlim = (-0.9, 0.9)
         self.current_ylim = (-0.7, 0.7)
 
+        self.scene_nodes = {}
+        self.scene_edges = {}
+        self.scene_edges_by_node = {}
+        self.timeline_artists = []
+        self.scene_view_key = None
+        self.dirty_nodes = set()
+        self.highlighted_node = None
+        self.blit_background = None
+        self.blit_artists = set()
+        self.drag_edges = set()
+        self.label_metrics = {}
+        self.label_metrics_key = None
+        self.render_pending = False
+
+    def setup_figure(self, figure, canvas):
+        self.figure = figure
+        self.ax = self.figure.add_subplot(111)
+        self.ax.set_facecolor('#ffffff')
+        self.canvas = canvas
+        self.measure_text = Text(0, 0, '')
+        self.measure_text.set_figure(self.figure)
+        self.profile_text = self.figure.text(0.005, 0.005, '', ha='left', va='bottom', fontsize=7, family='monospace', zorder=10, visible=False,
+                                             bbox=dict(facecolor='white', edgecolor='gray', alpha=0.85))
+        self.clear_scene()
+
+
+# render
+    def update_display(self):
+        self.render_pending = True
+
+    def flush_display(self):
+        if self.render_pending:
+            self.render_display()
+
+    def render_display(self):
+        self.render_pending = False
+        metrics_key = (self.current_scale, self.figure.dpi)
+        if metrics_key != self.label_metrics_key:
+            self.label_metrics_key = metrics_key
+            self.label_metrics = {}
+
+        self.ax.set_xlim(self.current_xlim)
+        self.ax.set_ylim(self.current_ylim)
+
+        view_key = (self.current_xlim, self.current_ylim, self.current_scale, self.show_timeline, tuple(self.current_category_filter), self.current_node_filter,
+                    self.project_start, self.project_end, self.column_width, self.current_week_offset, self.current_time_scale,
+                    self.graph.number_of_nodes() == 0, tuple(self.ax.bbox.size))
+
+        if view_key != self.scene_view_key:
+            self.scene_view_key = view_key
+            start = self.profiler.start()
+            self.update_timeline(len(self.filtered_nodes()) > 0)
+            self.profiler.stop('timeline', start)
+            self.update_scene(self.view_nodes.query(*self.current_xlim), True, self.view_edges.query(*self.current_xlim))
+        elif self.dirty_nodes:
+            self.update_scene(self.dirty_nodes, False)
+
+        self.dirty_nodes = set()
+
+        if self.show_profile:
+            self.profile_text.set_text(self.profiler.summary())
+
+    def update_scene(self, nodes, full, edges=None):
+        units = self.data_units()
+        fontsize = 8 * self.current_scale
+        level = self.detail_level()
+        filtered_nodes = self.filtered_nodes()
+        start = self.profiler.start()
+
+        if full:
+            self.label_grid.reset(64 * units[0], 16 * units[1])
+
+        labelled_nodes = set()
+        dotted_nodes = set()
+        revisited = set()
+        pending = set(nodes)
+        if level == 'names':
+            queue = [(self.label_priority(node), node) for node in nodes]
+            heapq.heapify(queue)
+        else:
+            queue = [(None, node) for node in nodes]
+
+        while queue:
+            priority, node = heapq.heappop(queue) if level == 'names' else queue.pop()
+            pending.discard(node)
+            labelled_nodes.discard(node)
+            dotted_nodes.discard(node)
+            revisit = ()
+
+            if node in self.graph and node in self.node_positions and node in filtered_nodes and self.is_in_view(*self.node_positions[node]):
+                x, y = self.node_positions[node]
+                color = self.node_color(node)
+                label = node_label(node) if level == 'full' else node.name
+                extent = None
+
+                if level == 'full':
+                    extent = self.measure_label(label, fontsize)
+                elif level == 'names':
+                    extent, revisit = self.place_label(node, priority, x, y, label, fontsize, units)
+
+                if extent is None:
+                    dotted_nodes.add(node)
+                    dots = self.drag_node_dots if node == self.dragged_node and node in self.drag_node_dots else self.node_dots
+                    dots.set(node, (x, y), color)
+                else:
+                    labelled_nodes.add(node)
+                    if node not in self.scene_nodes:
+                        self.scene_nodes[node] = SceneNode(self.ax)
+
+                    scene_node = self.scene_nodes[node]
+                    scene_node.update(x, y, label, fontsize, extent, units)
+
+                    boxes = self.drag_node_boxes if node == self.dragged_node and node in self.drag_node_boxes else self.node_boxes
+                    boxes.set(node, scene_node.path, color)
+            elif level == 'names':
+                revisit = self.label_grid.release(node)
+
+            for other in revisit:
+                if other not in pending:
+                    pending.add(other)
+                    revisited.add(other)
+                    heapq.heappush(queue, (self.label_priority(other), other))
+
+        dot_nodes = self.node_dots.index.keys() | self.drag_node_dots.index.keys()
+        hidden_labels = self.scene_nodes.keys() - labelled_nodes if full else (revisited.union(nodes) - labelled_nodes) & self.scene_nodes.keys()
+        hidden_dots = dot_nodes - dotted_nodes if full else (revisited.union(nodes) - dotted_nodes) & dot_nodes
+
+        for node in hidden_labels:
+            self.scene_nodes.pop(node).remove()
+            self.node_boxes.remove(node)
+            self.drag_node_boxes.remove(node)
+
+        for node in hidden_dots:
+            self.node_dots.remove(node)
+            self.drag_node_dots.remove(node)
+
+        for boxes in (self.node_boxes, self.drag_node_boxes, self.node_dots, self.drag_node_dots):
+            boxes.flush()
+
+        self.profiler.stop('labels', start)
+        start = self.profiler.start()
+
+        if edges is not None:
+            edges = set(edges)
+        elif full:
+            edges = set(self.filtered_graph().subgraph(nodes).edges)
+        else:
+            edges = set()
+            for node in nodes:
+                if node in self.graph:
+                    edges.update(self.graph.in_edges(node))
+                    edges.update(self.graph.out_edges(node))
+                edges.update(self.scene_edges_by_node.get(node, ()))
+
+        shown_edges = []
+        for u, v in edges:
+            if not self.graph.has_edge(u, v) or u not in self.node_positions or v not in self.node_positions:
+                continue
+
+            if u not in filtered_nodes or v not in filtered_nodes:
+                continue
+
+            if self.is_edge_in_view(u, v):
+                shown_edges.append((u, v))
+
+        if shown_edges:
+            for edge, route in zip(shown_edges, self.route_edges(shown_edges, fontsize, units)):
+                if edge not in self.scene_edges:
+                    self.scene_edges_by_node.setdefault(edge[0], set()).add(edge)
+                    self.scene_edges_by_node.setdefault(edge[1], set()).add(edge)
+                self.scene_edges[edge] = route
+                lines = self.drag_edge_lines if edge in self.drag_edges else self.edge_lines
+                lines.set(edge, route, self.edge_color(*edge))
+
+        hidden_edges = self.scene_edges.keys() - set(shown_edges) if full else (edges - set(shown_edges)) & self.scene_edges.keys()
+        for u, v in hidden_edges:
+            del self.scene_edges[(u, v)]
+            self.edge_lines.remove((u, v))
+            self.drag_edge_lines.remove((u, v))
+            for node in (u, v):
+                self.scene_edges_by_node[node].discard((u, v))
+                if not self.scene_edges_by_node[node]:
+                    del self.scene_edges_by_node[node]
+
+        line_width = 1 + 0.001 / units[1] * 72 / self.figure.dpi if level != 'dots' else dots_line_width()
+        for lines in (self.edge_lines, self.drag_edge_lines):
+            lines.lines.set_linewidth(line_width)
+            lines.flush()
+
+        self.profiler.stop('edges', start)
+
+    def update_drag_edges(self, drag_edges):
+        for edge in self.drag_edges ^ drag_edges:
+            source, target = (self.drag_edge_lines, self.edge_lines) if edge in self.drag_edges else (self.edge_lines, self.drag_edge_lines)
+            if edge in source:
+                i = source.index[edge]
+                target.set(edge, source.routes[i], source.colors[i])
+                source.remove(edge)
+
+        self.drag_edges = drag_edges
+        self.edge_lines.flush()
+        self.drag_edge_lines.flush()
+
+    def update_edge_colors(self):
+        for lines in (self.edge_lines, self.drag_edge_lines):
+            lines.recolor(self.edge_color)
+            lines.flush()
+
+    def update_timeline(self, has_nodes):
+        for artist in self.timeline_artists:
+            artist.remove()
+        self.timeline_artists = []
+
+        if self.calendar is None or not self.show_timeline:
+            return
+
+        start_week = self.current_week_offset
+        end_week = min(start_week + self.current_time_scale, len(self.calendar))
+        first = max(start_week, start_week + math.floor(self.current_xlim[0] / self.column_width) - 1)
+        last = min(end_week, start_week + math.ceil(self.current_xlim[1] / self.column_width) + 1)
+
+        for i in range(first, last):
+            if has_nodes:
+                x = (i - start_week) * self.column_width
+
+                if self.current_xlim[0] <= x <= self.current_xlim[1]:
+                    self.timeline_artists.append(self.ax.text(x, self.current_ylim[1], self.calendar.label(i), ha='center', va='bottom', color='black', fontsize=8 * self.current_scale))
+                    self.timeline_artists.append(self.ax.axvline(x,color='gray', linestyle='--', alpha=0.5, linewidth=0.3))
+            else:
+                x = (i - start_week + 0.5) * self.column_width
+
+                if self.current_xlim[0] <= x <= self.current_xlim[1]:
+                    self.timeline_artists.append(self.ax.text(x, 1.05 / self.current_scale, self.calendar.label(i), ha='center', va='bottom', fontsize=8 * self.current_scale, color='black'))
+                    self.timeline_artists.append(self.ax.axvline((i - start_week) * self.column_width, color='gray', linestyle='--', alpha=0.3, linewidth=1 * self.current_scale))
+
+    def blit_drag(self):
+        if self.blit_background is None:
+            self.flush_display()
+
+        self.update_scene(self.dirty_nodes, False)
+        self.dirty_nodes = set()
+
+        drag_edges = self.scene_edges_by_node.get(self.dragged_node, set())
+        if drag_edges != self.drag_edges:
+            self.update_drag_edges(set(drag_edges))
+
+        for boxes, drag_boxes in ((self.node_boxes, self.drag_node_boxes), (self.node_dots, self.drag_node_dots)):
+            if self.dragged_node in boxes:
+                index = boxes.index[self.dragged_node]
+                drag_boxes.set(self.dragged_node, boxes.paths[index], boxes.colors[index])
+                boxes.remove(self.dragged_node)
+                boxes.flush()
+                drag_boxes.flush()
+
+        artists = [self.drag_edge_lines.lines, self.drag_edge_lines.heads, self.drag_node_boxes.collection, self.drag_node_dots.collection]
+        if self.dragged_node in self.scene_nodes:
+            artists.append(self.scene_nodes[self.dragged_node].text)
+
+        for artist in artists:
+            artist.set_animated(True)
+        self.blit_artists.update(artists)
+
+        if self.blit_background is None:
+            self.canvas.draw()
+            self.blit_background = self.canvas.copy_from_bbox(self.ax.bbox)
+
+        self.canvas.restore_region(self.blit_background)
+        for artist in artists:
+            self.ax.draw_artist(artist)
+        self.canvas.blit(self.ax.bbox)
+
+    def start_blit_pan(self):
+        self.flush_display()
+        self.canvas.draw()
+        self.blit_background = self.canvas.copy_from_bbox(self.ax.bbox)
+
+    def blit_pan(self, dx, dy):
+        if self.blit_background is None:
+            return
+
+        units = self.data_units()
+        offset_x = int(round(dx / units[0]))
+        offset_y = int(round(-dy / units[1]))
+
+        x1, y1, x2, y2 = self.blit_background.get_extents()
+        source = (x1 + 3 + max(0, -offset_x), y1 + 3 + max(0, -offset_y), x2 - 3 - max(0, offset_x), y2 - 3 - max(0, offset_y))
+
+        self.ax.draw_artist(self.ax.patch)
+        if source[0] < source[2] and source[1] < source[3]:
+            self.canvas.restore_region(self.blit_background, bbox=source, xy=(x1 + offset_x, y1 + offset_y))
+        for spine in self.ax.spines.values():
+            self.ax.draw_artist(spine)
+        self.canvas.blit(self.ax.bbox)
+
+    def end_blit(self):
+        for artist in self.blit_artists:
+            artist.set_animated(False)
+
+        self.blit_artists = set()
+        self.blit_background = None
+
+        if self.drag_edges:
+            self.update_drag_edges(set())
+
+        for boxes, drag_boxes in ((self.node_boxes, self.drag_node_boxes), (self.node_dots, self.drag_node_dots)):
+            for node, path, color in zip(drag_boxes.nodes, drag_boxes.paths, drag_boxes.colors):
+                boxes.set(node, path, color)
+            for node in list(drag_boxes.nodes):
+                drag_boxes.remove(node)
+            boxes.flush()
+            drag_boxes.flush()
+
+    def clear_scene(self):
+        self.ax.clear()
+        self.ax.set_xticks([])
+        self.ax.set_yticks([])
+
+        self.edge_lines = EdgeLines(self.ax)
+        self.drag_edge_lines = EdgeLines(self.ax, animated=True)
+        self.node_boxes = NodeBoxes(self.ax)
+        self.drag_node_boxes = NodeBoxes(self.ax, animated=True)
+        self.node_dots = NodeDots(self.ax)
+        self.drag_node_dots = NodeDots(self.ax, animated=True)
+        self.label_grid = LabelGrid()
+        self.route_cache = EdgeRouteCache()
+
+        self.scene_nodes = {}
+        self.scene_edges = {}
+        self.scene_edges_by_node = {}
+        self.drag_edges = set()
+        self.timeline_artists = []
+        self.scene_view_key = None
+        self.dirty_nodes = set()
+        self.highlighted_node = None
+        self.end_blit()
+
+    def node_color(self, node):
+        if node == self.selected_node:
+            return 'salmon'
+        if self.show_critical_path and self.critical_path.is_critical(node):
+            return '#f5c27a'
+        return '#b9d0f0'
+
+    def edge_color(self, source, target):
+        if source == self.highlighted_node:
+            return 'red'
+        if self.show_critical_path and self.graph.has_edge(source, target) and self.critical_path.is_critical_edge(source, target):
+            return 'darkorange'
+        return 'gray'
+
+    def update_critical_path(self, downstream, upstream):
+        if not self.show_critical_path:
+            self.critical_path.defer(downstream, upstream)
+            return
+
+        changed = self.critical_path.update(downstream, upstream)
+
+        if changed is None:
+            self.mark_dirty(*self.scene_nodes, *self.node_dots.nodes)
+            self.update_edge_colors()
+        else:
+            self.mark_dirty(*changed)
+
+    def mark_dirty(self, *nodes):
+        self.dirty_nodes.update(node for node in nodes if node is not None)
+
+    def data_units(self):
+        width, height = self.ax.bbox.size
+        return ((self.current_xlim[1] - self.current_xlim[0]) / width, (self.current_ylim[1] - self.current_ylim[0]) / height)
+
+    def is_in_view(self, x, y):
+        return self.current_xlim[0] <= x <= self.current_xlim[1] and self.current_ylim[0] <= y <= self.current_ylim[1]
+
+    def is_edge_in_view(self, source, target):
+        (x1, y1), (x2, y2) = self.node_positions[source], self.node_positions[target]
+        return min(x1, x2) <= self.current_xlim[1] and max(x1, x2) >= self.current_xlim[0] and min(y1, y2) <= self.current_ylim[1] and max(y1, y2) >= self.current_ylim[0]
+
+    def measure_label(self, label, fontsize):
+        extent = self.label_metrics.get((label, fontsize))
+
+        if extent is None:
+            start = self.profiler.start()
+            self.measure_text.set_text(label)
+            self.measure_text.set_fontsize(fontsize)
+            bbox = self.measure_text.get_window_extent(renderer=self.figure.canvas.get_renderer())
+            extent = self.label_metrics[(label, fontsize)] = (bbox.width, bbox.height)
+            self.profiler.stop('measure', start)
+
+        return extent
+
+    def estimate_label(self, label, fontsize):
+        font_pixels = fontsize * self.figure.dpi / 72
+        lines = label.split('\n')
+        return (max(map(len, lines)) * font_pixels * 0.55, len(lines) * font_pixels * 1.2)
+
+    def label_rect(self, x, y, extent, units):
+        half_width = (extent[0] / 2 + label_spacing()) * units[0]
+        half_height = (extent[1] / 2 + label_spacing()) * units[1]
+        return (x - half_width, y - half_height, x + half_width, y + half_height)
+
+    def label_priority(self, node):
+        critical = self.show_critical_path and node in self.graph and self.critical_path.is_critical(node)
+        return (node != self.selected_node, not critical, self.node_positions.get(node, (math.inf,))[0], node.id)
+
+    def place_label(self, node, priority, x, y, label, fontsize, units):
+        revisit = self.label_grid.release(node)
+        claim = self.label_rect(x, y, self.estimate_label(label, fontsize), units)
+        extent = rect = None
+
+        if self.label_grid.fits(priority, *claim):
+            extent = self.measure_label(label, fontsize)
+            rect = self.label_rect(x, y, extent, units)
+            claim = (min(claim[0], rect[0]), min(claim[1], rect[1]), max(claim[2], rect[2]), max(claim[3], rect[3]))
+            if not self.label_grid.fits(priority, *rect):
+                extent = rect = None
+
+        return extent, revisit + self.label_grid.claim(node, priority, claim, rect)
+
+    def node_extent(self, node, fontsize):
+        scene_node = self.scene_nodes.get(node)
+        if scene_node and scene_node.fontsize == fontsize:
+            return scene_node.extent
+        if self.detail_level() != 'full':
+            return (0, 0)
+
+        estimate = self.route_cache.extents.get(node)
+        if estimate is None or estimate[0] != fontsize:
+            estimate = self.route_cache.extents[node] = (fontsize, self.estimate_label(node_label(node), fontsize))
+        return estimate[1]
+
+    def route_edges(self, edges, fontsize, units):
+        widths = {}
+        keys = []
+        for u, v in edges:
+            for node in (u, v):
+                if node not in widths:
+                    widths[node] = self.node_extent(node, fontsize)[0] * units[0]
+            keys.append((self.node_positions[u], self.node_positions[v], widths[u], widths[v]))
+
+        routes = [self.route_cache.route(edge, key) for edge, key in zip(edges, keys)]
+        missing = [i for i, route in enumerate(routes) if route is None]
+        if not missing:
+            return routes
+
+        endpoints = numpy.array([keys[i][0] + keys[i][1] for i in missing])
+        sizes = numpy.array([keys[i][2:] for i in missing])
+        lines, heads = edge_routes(*endpoints.T, *sizes.T)
+
+        if self.avoid_obstacles:
+            reference = (round(units[0] * self.current_scale, 12), round(units[1] * self.current_scale, 12))
+            self.route_cache.measure(reference, self.node_positions, lambda node: self.obstacle_size(node, reference))
+            lines = [self.detour_route(edges[i], line) for i, line in zip(missing, lines)]
+
+        for i, line, head in zip(missing, lines, heads):
+            routes[i] = (line, head)
+            self.route_cache.set_route(edges[i], keys[i], routes[i])
+        return routes
+
+    def detour_route(self, edge, line):
+        waypoints = self.obstacle_waypoints(*edge)
+        if waypoints is None:
+            return line
+
+        (start, y1), (end, y2) = line[0], line[-1]
+        x1, y, x2 = waypoints
+        x1, x2 = max(x1, start), min(x2, end)
+        return numpy.array([(start, y1), (x1, y1), (x1, y), (x2, y), (x2, y2), (end, y2)])
+
+    def obstacle_waypoints(self, u, v):
+        key = (self.node_positions[u], self.node_positions[v])
+        cached = self.route_cache.waypoints.get((u, v))
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        (x1, y1), (x2, y2) = key
+        x_start = x1 + self.route_cache.sizes[u][0] + route_gap()
+        x_end = x2 - self.route_cache.sizes[v][0] - route_gap()
+        mid_x, mid_y = (x1 + x2) / 2, (y1 + y2) / 2
+
+        waypoints = None
+        if x_start >= x_end or not self.is_route_clear([(x_start, y1), (mid_x, y1), (mid_x, y2), (x_end, y2)], (u, v)):
+            channels = [mid_y, y1, y2] + [mid_y + sign * step * lane_height() / 2 for step in range(1, route_search_steps() + 1) for sign in (-1, 1)]
+            waypoints = next(((x_start, y, x_end) for y in channels if self.is_route_clear([(x_start, y1), (x_start, y), (x_end, y), (x_end, y2)], (u, v))), None)
+
+        self.route_cache.set_waypoints((u, v), key, waypoints)
+        return waypoints
+
+    def is_route_clear(self, points, ends):
+        reach_x, reach_y = self.route_cache.reach
+        for (x0, y0), (x1, y1) in zip(points, points[1:]):
+            left, right, bottom, top = min(x0, x1), max(x0, x1), min(y0, y1), max(y0, y1)
+            for node, (x, y) in self.node_grid.within(left - reach_x, bottom - reach_y, right + reach_x, top + reach_y):
+                if node in ends:
+                    continue
+                width, height = self.route_cache.sizes.get(node, (0, 0))
+                if left - width < x < right + width and bottom - height < y < top + height:
+                    return False
+        return True
+
+    def obstacle_size(self, node, reference):
+        width, height = self.estimate_label(node_label(node), 8)
+        return (width * reference[0] / 2, height * reference[1] / 2)
+
+    def detail_level(self):
+        font_pixels = 8 * self.current_scale * self.figure.dpi / 72
+        if font_pixels < dots_font_pixels():
+            return 'dots'
+        if font_pixels < names_font_pixels():
+            return 'names'
+        return 'full'
+        
+
+    def set_dates(self):
+            self.project_start = datetime.datetime.strptime(self.start_entry, "%d.%m.%Y").date()
+            self.project_end = datetime.datetime.strptime(self.end_entry, "%d.%m.%Y").date()
+
+            previous_calendar, previous_width = self.calendar, self.column_width
+            self.calculate_calendar()
+            self.current_time_scale = len(self.calendar)
+            self.column_width = float(self.column_width_base) / self.current_time_scale
+
+            if previous_calendar is not None and self.node_positions:
+                self.set_node_positions(calendar_positions(self.node_positions, previous_calendar, previous_width, self.calendar, self.column_width))
+
+            self.update_display()
+
+    def calculate_calendar(self):
+        self.calendar = Calendar(self.project_start, self.project_end, self.time_granularity)
+        self.project_start_calculated = self.project_start - datetime.timedelta(days=self.project_start.weekday())
+
+    def calculate_date_x_position(self, date):
+        return float(self.calendar.columns(date)) * self.column_width
+
+    def calculate_date_x_positions(self, dates):
+        return self.calendar.columns(dates) * self.column_width
+
+
+# model
+    def reset_model(self, graph):
+        self.graph = graph
+        self.reachability = ReachabilityIndex(self.graph)
+        self.topological_order = TopologicalOrder(self.graph)
+        self.schedule = Schedule(self.graph)
+        self.critical_path = CriticalPath(self.graph, self.schedule)
+        self.categories = CategoryIndex(self.graph)
+        self.node_ids = {node.id: node for node in self.graph}
+        self.filter_cache = None
+        self.lane_layout = None
+
+    def load_project(self, data):
+        self.reset_model(data['graph'])
+        self.node_positions = data.get('positions', {})
+        self.current_category_filter = data.get('filter', [])
+        self.current_node_filter = None
+        self.start_entry = data.get('project_start').strftime("%d.%m.%Y")
+        self.end_entry = data.get('project_end').strftime("%d.%m.%Y")
+        self.current_scale = data.get('current_scale', 1.0)
+        self.current_week_offset = data.get('current_week_offset', 0)
+        self.current_xlim = data.get('current_xlim', (-0.9, 0.9))
+        self.current_ylim = data.get('current_ylim', (-0.7, 0.7))
+        self.column_width_base = data.get('column_width_base', "8.0")
+        self.time_granularity = data.get('granularity', 'week')
+        self.calendar = None
+
+        self.rebuild_node_index()
+        self.clear_scene()
+
+        self.set_dates()
+
+    def project_data(self, sequence=0):
+        return {
+            'sequence': sequence,
+            'graph': self.graph,
+            'positions': self.node_positions,
+            'filter': self.current_category_filter,
+            'project_start': self.project_start,
+            'project_end': self.project_end,
+            'current_scale': self.current_scale,
+            'current_week_offset': self.current_week_offset,
+            'current_xlim': self.current_xlim,
+            'current_ylim': self.current_ylim,
+            'column_width_base': self.column_width_base,
+            'granularity': self.time_granularity,
+        }
+
+    def add_graph_node(self, node):
+        self.graph.add_node(node)
+        self.categories.add(node)
+        self.node_ids[node.id] = node
+        self.topological_order.add_node(node)
+        self.schedule.add_node(node)
+        self.update_critical_path((node,), (node,))
+
+    def add_graph_edge(self, source, target):
+        if not self.topological_order.add_edge(source, target):
+            return False
+
+        self.graph.add_edge(source, target)
+        self.reachability.add_edge(source, target)
+        self.schedule.add_edge(source, target)
+        self.index_edges([(source, target)])
+        self.update_critical_path((target,), (source,))
+        return True
+
+    def remove_graph_node(self, node):
+        predecessors = list(self.graph.predecessors(node))
+        successors = list(self.graph.successors(node))
+
+        for edge in self.incident_edges([node]):
+            self.view_edges.remove(edge)
+
+        self.categories.remove(node)
+        self.node_ids.pop(node.id, None)
+        self.route_cache.invalidate([node])
+        self.reachability.remove_node(node)
+        self.topological_order.remove_node(node)
+        self.schedule.remove_node(node)
+        self.graph.remove_node(node)
+        self.update_critical_path(successors, predecessors)
+
+    def set_node_category(self, node, category):
+        self.categories.remove(node)
+        node.category = category
+        self.categories.add(node)
+        self.route_cache.invalidate([node])
+        self.mark_dirty(node)
+
+    def toggle_lane_layout(self):
+        if self.lane_layout:
+            self.lane_layout = None
+            return {}
+
+        self.lane_layout = LaneLayout(self.graph, week_layer)
+        return self.apply_lanes(self.lane_layout.build(self.lane_hints(self.graph)))
+
+    def relayout_lanes(self, nodes, pinned=()):
+        if not self.lane_layout:
+            return {}
+        return self.apply_lanes(self.lane_layout.update(nodes, self.lane_hints(pinned)))
+
+    def reschedule_event(self, node, date):
+        nodes, dates = self.schedule.reschedule(node, date)
+        self.update_critical_path((node,), list(self.graph.predecessors(node)))
+
+        xs = self.calculate_date_x_positions(dates).tolist()
+        self.set_node_positions({n: (x, self.node_positions[n][1]) for n, x in zip(nodes, xs) if n in self.node_positions})
+        return list(zip(nodes, xs))
+
+
+# export
+    def write_image(self, filename):
+        self.flush_display()
+        self.profile_text.set_visible(False)
+        self.figure.savefig(filename, bbox_inches='tight', dpi=150)
+        self.profile_text.set_visible(self.show_profile)
+
+    def write_pdf(self, filename):
+        self.flush_display()
+        page = self.page_scene()
+        tiles, tile_width, tile_height, top = self.pdf_tiles(page)
+        caption = page.figure.text(0.5, 0.02, '', ha='center', va='bottom', fontsize=8)
+
+        with PdfPages(filename) as pdf:
+            if not tiles:
+                page.render_display()
+                pdf.savefig(page.figure)
+                return
+
+            for number, ((column, band), (nodes, edges)) in enumerate(sorted(tiles.items(), key=lambda tile: (tile[0][1], tile[0][0])), 1):
+                page.current_xlim = (column * tile_width - self.column_width / 2, (column + 1) * tile_width + self.column_width / 2)
+                page.current_ylim = (top - (band + 1) * tile_height - pdf_tile_margin() * tile_height, top - band * tile_height + pdf_tile_margin() * tile_height)
+                page.ax.set_xlim(page.current_xlim)
+                page.ax.set_ylim(page.current_ylim)
+
+                first_day, last_day = self.calendar.span(round(column * tile_width / self.column_width), round(tile_width / self.column_width))
+                caption.set_text(f"Страница {number} из {len(tiles)} · {first_day.strftime('%d.%m.%Y')} – {last_day.strftime('%d.%m.%Y')} · полоса {band + 1}")
+
+                page.update_timeline(True)
+                page.update_scene(nodes, True, edges)
+                pdf.savefig(page.figure)
+
+    def page_scene(self):
+        page = EventScene()
+        page.init_scene()
+        for key in ('graph', 'schedule', 'critical_path', 'categories', 'node_positions', 'current_category_filter', 'current_node_filter', 'current_scale', 'current_week_offset',
+                    'current_time_scale', 'project_start', 'project_end', 'project_start_calculated', 'calendar', 'column_width', 'show_timeline', 'show_critical_path', 'avoid_obstacles',
+                    'node_grid'):
+            setattr(page, key, getattr(self, key))
+
+        page.current_xlim = self.current_xlim
+        page.current_ylim = self.current_ylim
+        figure = Figure(figsize=pdf_page_size(), dpi=self.figure.dpi)
+        page.setup_figure(figure, FigureCanvasAgg(figure))
+        return page
+
+    def pdf_tiles(self, page):
+        nodes = [node for node in self.get_filtered_nodes() if node in self.node_positions]
+        if not nodes or self.calendar is None:
+            return {}, 0, 0, 0
+
+        view_width, view_height = self.ax.bbox.size
+        page_width, page_height = page.ax.bbox.size
+        weeks = max(1, round((self.current_xlim[1] - self.current_xlim[0]) / view_width * page_width / self.column_width))
+        tile_width = weeks * self.column_width
+        tile_height = (self.current_ylim[1] - self.current_ylim[0]) / view_height * page_height / (1 + 2 * pdf_tile_margin())
+
+        top = max(self.node_positions[node][1] for node in nodes)
+        margin_x = self.column_width / 2
+        margin_y = pdf_tile_margin() * tile_height
+
+        tiles = {}
+        for node in nodes:
+            x, y = self.node_positions[node]
+            tiles.setdefault((math.floor(x / tile_width), math.floor((top - y) / tile_height)), ([], []))[0].append(node)
+
+        for u, v in self.filtered_graph().edges:
+            if u not in self.node_positions or v not in self.node_positions:
+                continue
+            (x1, y1), (x2, y2) = self.node_positions[u], self.node_positions[v]
+            for column in tile_span(min(x1, x2), max(x1, x2), tile_width, margin_x):
+                for band in tile_span(top - max(y1, y2), top - min(y1, y2), tile_height, margin_y):
+                    if (column, band) in tiles:
+                        tiles[column, band][1].append((u, v))
+
+        return tiles, tile_width, tile_height, top
+
+    def write_excel(self, filename):
+        write_excel_workbook(filename, self.excel_columns())
+
+    def excel_columns(self):
+        nodes = self.get_filtered_nodes()
+        rows = {node: i for i, node in enumerate(nodes)}
+        edges = [(rows[source], rows[target], lag) for source, target, lag in self.filtered_graph().edges(data='lag')]
+        edges = numpy.array(edges, dtype=numpy.int64).reshape(-1, 3)
+        dates = numpy.array([node.date for node in nodes], dtype='datetime64[D]')
+        earliest, latest = self.critical_path.columns(nodes)
+
+        return {
+            'ids': numpy.array([node.id for node in nodes], dtype=numpy.int64),
+            'names': [node.name for node in nodes],
+            'categories': [node.category for node in nodes],
+            'dates': dates,
+            'weeks': (dates - numpy.datetime64(self.project_start_calculated, 'D')).astype(numpy.int64) // 7 + 1,
+            'earliest': earliest,
+            'latest': latest,
+            'edge_sources': edges[:, 0],
+            'edge_targets': edges[:, 1],
+            'edge_lags': edges[:, 2],
+        }
+
+
+# help methods
+    def set_node_position(self, node, position):
+        self.node_positions[node] = position
+        self.node_grid.insert(node, *position)
+        self.view_nodes.insert(node, position[0], position[0])
+        self.index_edges(self.incident_edges([node]))
+        self.route_cache.invalidate([node])
+        self.mark_dirty(node)
+
+    def set_node_positions(self, positions):
+        self.node_positions.update(positions)
+        nodes = list(positions)
+        xs, ys = numpy.array(list(positions.values()), dtype=float).reshape(-1, 2).T
+        self.node_grid.insert_many(nodes, xs, ys)
+        self.index_edges(self.incident_edges(self.view_nodes.insert_many(nodes, xs, xs)))
+        self.route_cache.invalidate(positions)
+        self.dirty_nodes.update(positions)
+
+    def lane_hints(self, nodes):
+        return {node: -self.node_positions[node][1] / lane_height() for node in nodes if node in self.node_positions}
+
+    def apply_lanes(self, lanes):
+        positions = {node: (self.calculate_date_x_position(node.date), -lane * lane_height()) for node, lane in lanes.items()}
+        self.set_node_positions(positions)
+        return positions
+
+    def remove_node_position(self, node):
+        if node in self.node_positions:
+            del self.node_positions[node]
+        self.node_grid.remove(node)
+        self.view_nodes.remove(node)
+        for edge in self.incident_edges([node]):
+            self.view_edges.remove(edge)
+        self.route_cache.invalidate([node])
+        self.mark_dirty(node)
+
+    def rebuild_node_index(self):
+        self.node_grid.rebuild(self.node_positions)
+        self.route_cache = EdgeRouteCache()
+        self.view_nodes.clear()
+        self.view_edges.clear()
+        for node, (x, y) in self.node_positions.items():
+            self.view_nodes.insert(node, x, x)
+        self.index_edges(self.graph.edges)
+
+    def incident_edges(self, nodes):
+        rows = self.schedule.rows_of(nodes)
+        predecessor_index, predecessor_rows, _, successor_index, successor_rows = self.schedule.compressed()[:5]
+        outgoing, counts = adjacency_slices(successor_index, rows)
+        sources, targets = numpy.repeat(rows, counts), successor_rows[outgoing]
+
+        incoming, counts = adjacency_slices(predecessor_index, rows)
+        selected = numpy.zeros(len(self.schedule.nodes), dtype=bool)
+        selected[rows] = True
+        external = ~selected[predecessor_rows[incoming]]
+        sources = numpy.concatenate((sources, predecessor_rows[incoming][external])).tolist()
+        targets = numpy.concatenate((targets, numpy.repeat(rows, counts)[external])).tolist()
+
+        nodes = self.schedule.nodes
+        return list(zip([nodes[row] for row in sources], [nodes[row] for row in targets]))
+
+    def index_edges(self, edges):
+        spans = self.view_nodes.spans
+        for source, target in edges:
+            source_span, target_span = spans.get(source), spans.get(target)
+            if source_span and target_span:
+                self.view_edges.place((source, target), (source_span[0], target_span[0]) if source_span < target_span else (target_span[0], source_span[0]))
+
+    def find_node_at(self, x, y):
+        with self.profiler.measure('hit_test'):
+            return self.node_grid.nearest(x, y, hit_radius() / self.current_scale)
+
+    def get_filtered_nodes(self):
+        return list(self.filtered_nodes())
+
+    def filtered_nodes(self):
+        return self.filtered_view()[0]
+
+    def filtered_graph(self):
+        return self.filtered_view()[1]
+
+    def filtered_view(self):
+        if not self.current_category_filter and self.current_node_filter is None:
+            return self.graph.nodes, self.graph
+
+        key = (self.categories.version, tuple(self.current_category_filter), id(self.current_node_filter))
+        if self.filter_cache is None or self.filter_cache[0] != key or self.filter_cache[1] is not self.current_node_filter:
+            nodes = self.categories.union(self.current_category_filter) if self.current_category_filter else frozenset(self.graph.nodes)
+            if self.current_node_filter is not None:
+                nodes = nodes & self.current_node_filter
+            self.filter_cache = (key, self.current_node_filter, nodes, self.graph.subgraph(nodes))
+
+        return self.filter_cache[2], self.filter_cache[3]
+
+
+
+# canvas reporting draw times
+class ProfiledCanvas(FigureCanvas):
+    def __init__(self, figure, profiler):
+        super().__init__(figure)
+        self.profiler = profiler
+
+    def draw(self):
+        with self.profiler.measure('draw'):
+            super().draw()
+        if self.profiler.depth == 0:
+            self.profiler.end_frame(self.artist_count())
+
+    def artist_count(self):
+        return sum(len(ax.get_children()) for ax in self.figure.axes) + len(self.figure.texts)
+
+
+
+# event picker sorted by name
+class EventListModel(QAbstractListModel):
+    def __init__(self, nodes, parent=None):
+        super().__init__(parent)
+        nodes = list(nodes)
+        names = numpy.array([node.name for node in nodes], dtype=object)
+        keys = numpy.array([name.lower() for name in names.tolist()])
+        order = numpy.argsort(keys, kind='stable')
+
+        self.keys = keys[order]
+        self.names = names[order]
+        self.ids = numpy.array([node.id for node in nodes], dtype=numpy.int64)[order]
+        self.days = numpy.array([node.date.toordinal() for node in nodes], dtype=numpy.int64)[order]
+        self.rows = numpy.arange(len(nodes))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row = self.rows[index.row()]
+        if role == Qt.DisplayRole:
+            return f"{self.names[row]} ({datetime.date.fromordinal(int(self.days[row])).strftime('%d.%m.%Y')})"
+        if role == Qt.UserRole:
+            return int(self.ids[row])
+        return None
+
+    def event_id(self, index):
+        return int(self.ids[self.rows[index.row()]]) if index.isValid() else None
+
+    def day_range(self):
+        if not len(self.days):
+            return None
+        return int(self.days.min()), int(self.days.max())
+
+    def narrow(self, prefix, first_day, last_day):
+        prefix = prefix.lower()
+        start = int(numpy.searchsorted(self.keys, prefix, 'left'))
+        end = int(numpy.searchsorted(self.keys, prefix + chr(0x10ffff), 'left'))
+        days = self.days[start:end]
+
+        self.beginResetModel()
+        self.rows = start + numpy.flatnonzero((days >= first_day) & (days <= last_day))
+        self.endResetModel()
+
+
+
+class EventTreeApp(QMainWindow, EventScene):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("SmartEvent")
+        self.setWindowIcon(icon())
+        self.setMinimumSize(1500, 1500)
+
+        self.init_scene()
+        self.pan_mode = False
+        self.ctrl_pressed = False
+
+        self.render_timer = QTimer(self)
+        self.render_timer.setSingleShot(True)
+        self.render_timer.setInterval(16)
+        self.render_timer.timeout.connect(self.render_display)
+
+        self.project_path = None
+        self.journal = None
+        self.compaction = None
+        self.compaction_timer = QTimer(self)
+        self.compaction_timer.setInterval(60000)
+        self.compaction_timer.timeout.connect(self.compact_journal)
+        self.compaction_timer.start()
+
+        self.export_pool = concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+        self.excel_export = None
+        self.excel_filename = None
+        self.excel_timer = QTimer(self)
+        self.excel_timer.setInterval(100)
+        self.excel_timer.timeout.connect(self.check_excel_export)
+
         self.setup_ui()
         self.setup_menu()
 
@@ -95,7 +2192,7 @@ class EventTreeApp(QMainWindow):
             QLabel {
                 color: #333;
             }
-            QListWidget {
+            QListView {
                 background-color: white;
                 border: 1px solid #ccc;
                 border-radius: 4px;
@@ -148,17 +2245,22 @@ class EventTreeApp(QMainWindow):
         self.cursorpos_y = event.ydata
 
         if event.button == 1 and self.dragged_node and event.inaxes:
-            week = ((self.dragged_node.date - self.project_start_calculated).days) // 7
-            left_border = week * self.column_width * self.current_scale
-            right_border = (week + 1) * self.column_width * self.current_scale
-            self.node_positions[self.dragged_node] = (max(left_border, min(event.xdata, right_border)), event.ydata)
-            self.update_display()
+            start = self.profiler.start()
+            column = math.floor(self.calendar.columns(self.dragged_node.date))
+            left_border = column * self.column_width
+            right_border = (column + 1) * self.column_width
+            self.set_node_position(self.dragged_node, (max(left_border, min(event.xdata, right_border)), event.ydata))
+            self.blit_drag()
+            self.profiler.stop('motion', start)
+            self.profiler.end_frame(self.canvas.artist_count())
         elif event.button == 2:
+            start = self.profiler.start()
             if not hasattr(self, 'pan_start_x'):
                 self.pan_start_x = event.xdata
                 self.pan_start_y = event.ydata
                 self.initial_xlim = self.ax.get_xlim()
                 self.initial_ylim = self.ax.get_ylim()
+                self.start_blit_pan()
             else:
                 try:
                     dx = (event.xdata - self.pan_start_x)
@@ -169,68 +2271,63 @@ class EventTreeApp(QMainWindow):
 
                     self.current_xlim = new_xlim
                     self.current_ylim = new_ylim
+                    self.blit_pan(dx, dy)
                 except:
                     pass
+            self.profiler.stop('motion', start)
+            self.profiler.end_frame(self.canvas.artist_count())
 
     def on_release(self, event):
         if event.button == 1:
+            if self.dragged_node and self.blit_background is not None:
+                self.journal_record('move', self.dragged_node.id, *self.node_positions[self.dragged_node])
+                self.journal_layout(self.relayout_lanes([self.dragged_node], [self.dragged_node]))
             self.dragged_node = None
 
+            if self.blit_background is not None:
+                self.end_blit()
+                self.update_display()
+
         if hasattr(self, 'pan_start_x'):
             del self.pan_start_x
             del self.pan_start_y
             del self.initial_xlim
             del self.initial_ylim
 
+            self.end_blit()
             self.update_display()
 
     def on_canvas_click(self, event):
+        start = self.profiler.start()
         if event.button == 1:
             x, y = event.xdata, event.ydata
             if x is not None and y is not None:
-                min_dist = float('inf')
-                closest_node = None
-
-                for node in self.graph.nodes:
-                    if node in self.node_positions:
-                        nx_pos, ny_pos = self.node_positions[node]
-                        dist = (nx_pos - x) ** 2 + (ny_pos - y) ** 2
+                closest_node = self.find_node_at(x, y)
 
-                        if dist < min_dist:
-                            min_dist = dist
-                            closest_node = node
-
-                if min_dist < 0.02 and closest_node:
+                if closest_node:
                     self.dragged_node = closest_node
                     self.drag_start_x = x
                     self.drag_start_y = y
+                    self.mark_dirty(self.selected_node, closest_node)
                     self.selected_node = closest_node
-
-                    if self.ctrl_pressed:
-                        self.highlight_node(closest_node)
-                    else:
-                        self.update_display()
+                    self.highlight_node(closest_node if self.ctrl_pressed else None)
                 else:
+                    self.mark_dirty(self.selected_node)
                     self.selected_node = None
-                    self.update_display()
+                    self.highlight_node(None)
+
+                self.update_display()
 
         elif event.button == 3:
             x, y = event.xdata, event.ydata
+            closest_node = None
             if x is not None and y is not None:
-                min_dist = float('inf')
-                closest_node = None
-
-                for node in self.graph.nodes:
-                    if node in self.node_positions:
-                        nx_pos, ny_pos = self.node_positions[node]
-                        dist = (nx_pos - x) ** 2 + (ny_pos - y) ** 2
-
-                        if dist < min_dist:
-                            min_dist = dist
-                            closest_node = node
+                closest_node = self.find_node_at(x, y)
 
-                if min_dist < 0.02 and closest_node:
-                    self.show_context_menu(closest_node, event)
+            self.profiler.stop('click', start)
+            if closest_node:
+                self.show_context_menu(closest_node, event)
+            return
 
         elif event.button == 2 and self.ctrl_pressed:
             x, y = event.xdata, event.ydata
@@ -277,97 +2374,40 @@ class EventTreeApp(QMainWindow):
         elif event.button == 2 and not self.ctrl_pressed:
             x, y = event.xdata, event.ydata
             if x is not None and y is not None:
-                min_dist = float('inf')
-                closest_node = None
-                
-                for node in self.graph.nodes:
-                    if node in self.node_positions:
-                        nx_pos, ny_pos = self.node_positions[node]
-                        dist = (nx_pos - x) ** 2 + (ny_pos - y) ** 2
+                closest_node = self.find_node_at(x, y)
 
-                        if dist < min_dist:
-                            min_dist = dist
-                            closest_node = node
-
-                if min_dist < 0.02 and closest_node:
+                if closest_node:
                     self.dragged_node = closest_node
                     self.drag_start_x = x
                     self.drag_start_y = y
 
-        elif event.button == 3:
-            x, y = event.xdata, event.ydata
-            if x is not None and y is not None:
-                min_dist = float('inf')
-                closest_node = None
-
-                for node in self.graph.nodes:
-                    if node in self.node_positions:
-                        nx_pos, ny_pos = self.node_positions[node]
-                        dist = (nx_pos - x) ** 2 + (ny_pos - y) ** 2
-
-                        if dist < min_dist:
-                            min_dist = dist
-                            closest_node = node
-
-                if min_dist < 0.02 and closest_node:
-                    self.show_context_menu(closest_node, event)
+        self.profiler.stop('click', start)
 
     def highlight_node(self, node):
-        self.ax.clear()
-        filtered_nodes = self.get_filtered_nodes()
-        subgraph = self.graph.subgraph(filtered_nodes)
-        pos = {n: self.node_positions[n] for n in subgraph.nodes if n in self.node_positions}
-
-        networkx.draw(subgraph, pos, ax=self.ax,
-                labels={n: f"{n.name}\n{n.date.strftime('%d.%m.%Y')}\n({n.category})" for n in subgraph.nodes},
-                node_size=2500 * self.current_scale,
-                node_color='lightblue',
-                edge_color='gray',
-                font_size=9 * self.current_scale,
-                arrows=True,
-                arrowstyle='-|>',
-                arrowsize=20 * self.current_scale)
-
-        if node:
-            networkx.draw_networkx_nodes(subgraph, pos, nodelist=[node], node_color='salmon', ax=self.ax)
-            networkx.draw_networkx_edges(subgraph, pos, edgelist=self.graph.edges(node), edge_color='red', ax=self.ax)
-
-        self.canvas.draw()
+        if node != self.highlighted_node:
+            self.highlighted_node = node
+            self.update_edge_colors()
 
     def wheelEvent(self, event):
         if self.ctrl_pressed:
             delta = event.angleDelta().y() / 120
-            scale_factor = 1.1
-
-            if delta > 0:
-                self.current_scale *= scale_factor
-            else:
-                self.current_scale /= scale_factor
+            scale_factor = 1.1 if delta > 0 else 1 / 1.1
+            self.current_scale *= scale_factor
 
-            for node in self.node_positions:
-                x, y = self.node_positions[node]
-                scaler = scale_factor if delta > 0 else 1 / scale_factor
-                new_x = x * scaler
-                new_y = y * scaler
-                self.node_positions[node] = (new_x, new_y)
+            x_center = getattr(self, 'cursorpos_x', None)
+            y_center = getattr(self, 'cursorpos_y', None)
+            if x_center is None or y_center is None:
+                x_center = (self.current_xlim[0] + self.current_xlim[1]) / 2
+                y_center = (self.current_ylim[0] + self.current_ylim[1]) / 2
 
-            if self.cursorpos_x and self.cursorpos_y:
-                self.initial_xlim = self.ax.get_xlim()  
-                self.initial_ylim = self.ax.get_ylim()
-                
-                dx = self.cursorpos_x - (self.cursorpos_x * (scale_factor if delta > 0 else 1 / scale_factor))
-                dy = self.cursorpos_y - (self.cursorpos_y * (scale_factor if delta > 0 else 1 / scale_factor)) 
-                new_xlim = (self.initial_xlim[0] - dx, self.initial_xlim[1] - dx)
-                new_ylim = (self.initial_ylim[0] - dy, self.initial_ylim[1] - dy)
+            self.current_xlim = (x_center - (x_center - self.current_xlim[0]) / scale_factor, x_center + (self.current_xlim[1] - x_center) / scale_factor)
+            self.current_ylim = (y_center - (y_center - self.current_ylim[0]) / scale_factor, y_center + (self.current_ylim[1] - y_center) / scale_factor)
 
-                self.current_xlim = new_xlim
-                self.current_ylim = new_ylim
-
-                if hasattr(self, 'pan_start_x'):
-                    del self.pan_start_x
-                    del self.pan_start_y
-                    del self.initial_xlim
-                    del self.initial_ylim
+            if hasattr(self, 'pan_start_x'):
+                del self.pan_start_x
+                del self.pan_start_y
+                del self.initial_xlim
+                del self.initial_ylim
 
             self.update_display()
 
@@ -386,151 +2426,29 @@ class EventTreeApp(QMainWindow):
             self.show_next_events(node)
 
     def show_previous_events(self, node):
-        previous_nodes = set()
-        self.collect_previous_nodes(node, previous_nodes)
-        self.current_category_filter = list(previous_nodes)
+        self.current_category_filter = []
+        self.current_node_filter = set(self.reachability.ancestors(node))
         self.update_display()
 
-    def collect_previous_nodes(self, node, previous_nodes):
-        for predecessor in self.graph.predecessors(node):
-            previous_nodes.add(predecessor)
-            self.collect_previous_nodes(predecessor, previous_nodes)
-
     def show_next_events(self, node):
-        next_nodes = set()
-        self.collect_next_nodes(node, next_nodes)
-        self.current_category_filter = list(next_nodes)
+        self.current_category_filter = []
+        self.current_node_filter = set(self.reachability.descendants(node))
         self.update_display()
 
-    def collect_next_nodes(self, node, next_nodes):
-        for successor in self.graph.successors(node):
-            next_nodes.add(successor)
-            self.collect_next_nodes(successor, next_nodes)
-
 
 # render
     def update_display(self):
-        self.ax.clear()
-        self.ax.set_xticks([])
-        self.ax.set_yticks([])
-
-        self.ax.set_xlim(self.current_xlim)
-        self.ax.set_ylim(self.current_ylim)
-
-        fontsize = 8 * self.current_scale
-
-        if self.week_columns and self.show_timeline:
-            start_week = self.current_week_offset
-            end_week = start_week + self.current_time_scale
-
-            for i in range(start_week, end_week):
-                if i >= len(self.week_columns):
-                    break
-
-                start_of_week, end_of_week = self.week_columns[i]
-                x = (i - start_week) * self.column_width * self.current_scale
-
-                if self.current_xlim[0] <= x <= self.current_xlim[1]:
-                    self.ax.text(x, self.current_ylim[1], f"{start_of_week.strftime('%d\n%m')}", ha='center', va='bottom', color='black', fontsize=fontsize)
-                    self.ax.axvline(x,color='gray', linestyle='--', alpha=0.5, linewidth=0.3)
-
-        filtered_nodes = self.get_filtered_nodes()
-        subgraph = self.graph.subgraph(filtered_nodes)
-
-        boxwidth = 0
-        boxheight = 0
-
-        if subgraph.nodes:
-            for node in subgraph.nodes:
-                if node in self.node_positions:
-                    x, y = self.node_positions[node]
-                    color = 'salmon' if node == self.selected_node else '#b9d0f0'
-
-                    if self.current_xlim[0] <= x <= self.current_xlim[1] and self.current_ylim[0] <= y <= self.current_ylim[1]:
-                        text = f"{node.name}\n{node.date.strftime('%d.%m.%Y')}\n({node.category})"
-                        text_obj = self.ax.text(x, y, text, ha='center', va='center', color='black', fontsize=fontsize)
-
-                        bbox = text_obj.get_window_extent(renderer=self.figure.canvas.get_renderer())
-                        bbox = bbox.transformed(self.ax.transData.inverted())
-
-                        boxwidth = bbox.width
-                        boxheight = bbox.height
-
-                        rect = FancyBboxPatch((x - boxwidth / 2, y - boxheight / 2), boxwidth, boxheight, boxstyle="round,pad=0.01", edgecolor='black', facecolor=color, alpha=0.8, lw=1)
-                        self.ax.add_patch(rect)
-
-            for u, v in subgraph.edges:
-                if u not in self.node_positions or v not in self.node_positions:
-                    continue
-
-                x1, y1 = self.node_positions[u]
-                x2, y2 = self.node_positions[v]
-                mid_x = ((x1 + x2) / 2)
-                mid_y = ((y1 + y2) / 2)
-
-                if (self.current_xlim[0] <= x1 <= self.current_xlim[1] and self.current_ylim[0] <= y1 <= self.current_ylim[1]) or (self.current_xlim[0] <= x2 <= self.current_xlim[1] and self.current_ylim[0] <= y2 <= self.current_ylim[1]):
-                    line_width = 0.001 * self.current_scale
-                    head_width = 0.01 * self.current_scale
-                    head_length = 0.01 * self.current_scale
-                    x_offset = head_length * 2
-                    
-                    x1 = x1 + (boxwidth + head_length) / 2
-                    x2 = x2 - (boxwidth + head_length) / 2
-                    if x1+x_offset>=x2-x_offset:
-                        self.ax.arrow(x1, y1, x_offset, 0, color='gray', linestyle='-', width=line_width, head_width=0, head_length=0)
-                        self.ax.arrow(x1+x_offset, y1, 0, mid_y-y1, color='gray', linestyle='-', width=line_width, head_width=0, head_length=0)
-                        self.ax.arrow(x1+x_offset, mid_y, x2-x1-2*x_offset, 0, color='gray', linestyle='-', width=line_width, head_width=0, head_length=0)
-                        self.ax.arrow(x2-x_offset, mid_y, 0, y2-mid_y, color='gray', linestyle='-', width=line_width, head_width=0, head_length=0)
-                        self.ax.arrow(x2-x_offset, y2, x_offset, 0, color='gray', linestyle='-', width=line_width, head_width=head_width, head_length=head_length, length_includes_head = True)
-                    else:
-                        self.ax.arrow(x1, y1, mid_x-x1, 0, color='gray', linestyle='-', width=line_width, head_width=0, head_length=0)
-                        self.ax.arrow(mid_x, y1, 0, y2-y1, color='gray', linestyle='-', width=line_width, head_width=0, head_length=0)
-                        self.ax.arrow(mid_x, y2, x2-mid_x, 0, color='gray', linestyle='-', width=line_width, head_width=head_width, head_length=head_length, length_includes_head = True)
-
-        if self.week_columns and self.show_timeline and not subgraph.nodes:
-            start_week = self.current_week_offset
-            end_week = start_week + self.current_time_scale
-
-            for i in range(start_week, end_week):
-                if i >= len(self.week_columns):
-                    break
-
-                start_of_week, end_of_week = self.week_columns[i]
-                x = (i - start_week + 0.5) * self.column_width * self.current_scale
-                
-                if self.current_xlim[0] <= x <= self.current_xlim[1]:
-                    self.ax.text(x, 1.05, f"{start_of_week.strftime('%d\n%m')}", ha='center', va='bottom', fontsize=8 * self.current_scale, color='black')
-                    self.ax.axvline((i - start_week) * self.column_width * self.current_scale, color='gray', linestyle='--', alpha=0.3, linewidth=1 * self.current_scale)
-
-        self.canvas.draw()
-        
-    def set_dates(self):
-            self.project_start = datetime.datetime.strptime(self.start_entry, "%d.%m.%Y").date()
-            self.project_end = datetime.datetime.strptime(self.end_entry, "%d.%m.%Y").date()
-
-            self.calculate_calendar_weeks()
-            self.current_time_scale = len(self.week_columns)
-            self.column_width = float(self.column_width_base) / self.current_time_scale
-
-            self.update_display()
-
-    def calculate_calendar_weeks(self):
-        self.week_columns = []
-        current_date = self.project_start
-        self.project_start_calculated = self.project_start - datetime.timedelta(days=current_date.weekday())
+        super().update_display()
+        if not self.render_timer.isActive():
+            self.render_timer.start()
 
-        while current_date <= self.project_end:
-            start_of_week = current_date - datetime.timedelta(days=current_date.weekday())
-            end_of_week = start_of_week + datetime.timedelta(days=6)
+    def flush_display(self):
+        self.render_timer.stop()
+        super().flush_display()
 
-            if end_of_week > self.project_end:
-                end_of_week = self.project_end
-
-            self.week_columns.append((start_of_week, end_of_week))
-            current_date = end_of_week + datetime.timedelta(days=1)
-
-    def calculate_date_x_position(self, date):
-        return ((date - self.project_start_calculated).days / 7) * self.column_width * self.current_scale
+    def render_display(self):
+        super().render_display()
+        self.canvas.draw_idle()
 
 
 # startup dialog
@@ -571,54 +2489,75 @@ class EventTreeApp(QMainWindow):
         file_menu.addAction('Сохранить как...', self.save_project)
         file_menu.addSeparator()
         file_menu.addAction('Выход', self.close)
+
+        profile_menu = menubar.addMenu('Профилирование')
+        profile_menu.addAction('Показать замеры кадров', self.toggle_profile_overlay)
+        profile_menu.addAction('Сохранить замеры...', self.save_profile)
     
+
     def new_project(self):
-        self.graph = networkx.DiGraph()
+        self.close_journal()
+        self.reset_model(networkx.DiGraph())
         self.node_positions = {}
+        self.rebuild_node_index()
+        self.clear_scene()
         self.current_category_filter = []
+        self.current_node_filter = None
         self.selected_node = None
         self.project_start = None
         self.project_end = None
-        self.week_columns = []
+        self.calendar = None
         self.column_width = 0
         self.update_display()
         self.edit_project_dates()
 
     def open_project(self):
-        filepath, _ = QFileDialog.getOpenFileName(self, "Открыть проект", "", "Файлы проектов (*.pkl)")
+        filepath, _ = QFileDialog.getOpenFileName(self, "Открыть проект", "", "Файлы проектов (*.sev);;Старые файлы проектов (*.pkl)")
         if filepath:
-            with open(filepath, 'rb') as f:
-                data = pickle.load(f)
-            self.graph = data['graph']
-            self.node_positions = data.get('positions', {})
-            self.current_category_filter = data.get('filter', [])
-            self.start_entry = data.get('project_start').strftime("%d.%m.%Y")
-            self.end_entry = data.get('project_end').strftime("%d.%m.%Y")
-            self.current_scale = data.get('current_scale', 1.0)
-            self.current_week_offset = data.get('current_week_offset', 0)
-            self.current_xlim = data.get('current_xlim', (-0.9, 0.9))
-            self.current_ylim = data.get('current_ylim', (-0.7, 0.7))
-            self.column_width_base = data.get('column_width_base', "8.0")
+            start = self.profiler.start()
+            self.close_journal()
+            try:
+                if filepath.endswith('.pkl'):
+                    data, replayed = read_pickle_project(filepath), 0
+                else:
+                    data, replayed = read_project_with_journal(filepath)
+            except (ValueError, KeyError, OSError, struct.error) as e:
+                self.profiler.stop('open_project', start)
+                QMessageBox.critical(self, "Ошибка", f"Не удалось открыть проект: {str(e)}")
+                return
 
-            self.set_dates()
+            if not filepath.endswith('.pkl'):
+                self.project_path = filepath
+                self.journal = Journal(filepath, data['sequence'])
+                self.journal.records = replayed
+
+            self.load_project(data)
+            self.profiler.stop('open_project', start)
 
     def save_project(self):
-        filepath, _ = QFileDialog.getSaveFileName(self, "Сохранить проект", "", "Файлы проектов (*.pkl)")
+        filepath, _ = QFileDialog.getSaveFileName(self, "Сохранить проект", "", "Файлы проектов (*.sev)")
         if filepath:
-            data = {
-                'graph': self.graph,
-                'positions': self.node_positions,
-                'filter': self.current_category_filter,
-                'project_start': self.project_start,
-                'project_end': self.project_end,
-                'current_scale': self.current_scale,
-                'current_week_offset': self.current_week_offset,
-                'current_xlim': self.current_xlim,
-                'current_ylim': self.current_ylim,
-                'column_width_base': self.column_width_base,
-            }
-            with open(filepath, 'wb') as f:
-                pickle.dump(data, f)
+            if not filepath.endswith('.sev'):
+                filepath += '.sev'
+
+            start = self.profiler.start()
+            self.wait_compaction()
+            data = self.project_data(self.journal.sequence if self.journal else 0)
+            try:
+                write_project_file(filepath + '.tmp', data)
+                os.replace(filepath + '.tmp', filepath)
+            except OSError as e:
+                self.profiler.stop('save_project', start)
+                QMessageBox.critical(self, "Ошибка", f"Не удалось сохранить проект: {str(e)}")
+                return
+            self.profiler.stop('save_project', start)
+
+            if filepath != self.project_path:
+                self.close_journal()
+                self.project_path = filepath
+                self.journal = Journal(filepath, data['sequence'])
+            self.journal.reset()
+
             QMessageBox.information(self, "Успех", "Проект успешно сохранен")
 
     def edit_project_dates(self):
@@ -639,6 +2578,13 @@ class EventTreeApp(QMainWindow):
         self.column_width_base = QLineEdit(self.column_width_base)
         layout.addWidget(self.column_width_base)
 
+        layout.addWidget(QLabel("Шкала времени:"))
+        self.granularity_entry = QComboBox()
+        for granularity, title in calendar_granularities():
+            self.granularity_entry.addItem(title, granularity)
+        self.granularity_entry.setCurrentIndex(self.granularity_entry.findData(self.time_granularity))
+        layout.addWidget(self.granularity_entry)
+
         button = QPushButton("Установить")
         button.clicked.connect(self.edit_project_dates_set_dates)
         layout.addWidget(button)
@@ -650,6 +2596,7 @@ class EventTreeApp(QMainWindow):
             self.start_entry = self.start_entry.text()
             self.end_entry = self.end_entry.text()
             self.column_width_base = self.column_width_base.text()
+            self.time_granularity = self.granularity_entry.currentData()
             self.project_start = datetime.datetime.strptime(self.start_entry, "%d.%m.%Y").date()
             self.project_end = datetime.datetime.strptime(self.end_entry, "%d.%m.%Y").date()
 
@@ -657,6 +2604,7 @@ class EventTreeApp(QMainWindow):
                 raise ValueError("Дата окончания должна быть позже даты начала")
             
             self.set_dates()
+            self.journal_record('project', self.project_start.isoformat(), self.project_end.isoformat(), self.column_width_base, self.time_granularity)
 
             self.sender().parent().accept()
             return True
@@ -672,10 +2620,8 @@ class EventTreeApp(QMainWindow):
         self.setCentralWidget(self.main_widget)
 
         self.main_layout = QHBoxLayout(self.main_widget)
-        self.figure = matplotlib.pyplot.figure(figsize=(16, 10), dpi=100)
-        self.ax = self.figure.add_subplot(111)
-        self.ax.set_facecolor('#ffffff')
-        self.canvas = FigureCanvas(self.figure)
+        figure = matplotlib.pyplot.figure(figsize=(16, 10), dpi=100)
+        self.setup_figure(figure, ProfiledCanvas(figure, self.profiler))
         self.canvas.mpl_connect('button_press_event', self.on_canvas_click)
         self.canvas.mpl_connect('motion_notify_event', self.on_motion)
         self.canvas.mpl_connect('button_release_event', self.on_release)
@@ -696,6 +2642,9 @@ class EventTreeApp(QMainWindow):
             ("Связать события", self.link_events),
             ("Разорвать все связи", self.remove_links),
             ("Фильтр по категориям", self.filter_by_category),
+            ("Критический путь", self.toggle_critical_path),
+            ("Автоматическая раскладка", self.toggle_auto_layout),
+            ("Обход препятствий", self.toggle_obstacle_routing),
             ("Экспорт в Excel", self.export_to_excel),
             ("Экспорт в изображение", self.export_to_image),
             ("Экспорт в PDF", self.export_to_pdf)
@@ -725,6 +2674,44 @@ class EventTreeApp(QMainWindow):
         self.show_timeline = not self.show_timeline
         self.update_display()
 
+    def toggle_critical_path(self):
+        self.show_critical_path = not self.show_critical_path
+        self.critical_path.update()
+        self.mark_dirty(*self.scene_nodes, *self.node_dots.nodes)
+        self.update_edge_colors()
+        self.update_display()
+
+    def toggle_obstacle_routing(self):
+        self.avoid_obstacles = not self.avoid_obstacles
+        self.route_cache = EdgeRouteCache()
+        self.scene_view_key = None
+        self.update_display()
+
+    def toggle_auto_layout(self):
+        self.journal_layout(self.toggle_lane_layout())
+        self.update_display()
+
+    def toggle_profile_overlay(self):
+        self.show_profile = not self.show_profile
+        self.profile_text.set_text(self.profiler.summary())
+        self.profile_text.set_visible(self.show_profile)
+        self.update_display()
+
+    def save_profile(self):
+        if not self.profiler.frames:
+            QMessageBox.warning(self, "Внимание", "Нет замеров для сохранения!")
+            return
+
+        filename, _ = QFileDialog.getSaveFileName(self, "Сохранить замеры", "", "CSV файлы (*.csv);;JSON файлы (*.json)")
+        if filename:
+            try:
+                write_profile(filename, list(self.profiler.frames))
+            except OSError as e:
+                QMessageBox.critical(self, "Ошибка", f"Не удалось сохранить замеры: {str(e)}")
+                return
+
+            QMessageBox.information(self, "Успех", f"Замеры сохранены в {filename}")
+
     def add_event(self):
         dialog = QDialog(self)
         dialog.setMinimumSize(500,300)
@@ -765,12 +2752,14 @@ class EventTreeApp(QMainWindow):
             category = category_entry.text() or nocategory()
 
             new_event = EventNode(name, date, category)
-            self.graph.add_node(new_event)
+            self.add_graph_node(new_event)
 
             x = self.calculate_date_x_position(date)
             y = (self.ax.get_ylim()[0] - self.ax.get_ylim()[1])/2
 
-            self.node_positions[new_event] = (x, y)
+            self.set_node_position(new_event, (x, y))
+            self.journal_record('add', new_event.id, name, date.toordinal(), category, (x, y))
+            self.journal_layout(self.relayout_lanes([new_event]))
 
             self.update_display()
             dialog.close()
@@ -850,18 +2839,22 @@ class EventTreeApp(QMainWindow):
             category = category_entry.text() or nocategory()
 
             new_event = EventNode(name, date, category)
-            self.graph.add_node(new_event)
+            self.add_graph_node(new_event)
 
             x = self.calculate_date_x_position(date)
 
             if selected in self.node_positions:
                 parent_x, parent_y = self.node_positions[selected]
-                self.node_positions[new_event] = (x, parent_y)
+                self.set_node_position(new_event, (x, parent_y))
+            self.journal_record('add', new_event.id, name, date.toordinal(), category, self.node_positions.get(new_event))
 
             if new_event.date < selected.date:
-                self.graph.add_edge(new_event, selected)
+                self.add_graph_edge(new_event, selected)
+                self.journal_link(new_event, selected)
             else:
-                self.graph.add_edge(selected, new_event)
+                self.add_graph_edge(selected, new_event)
+                self.journal_link(selected, new_event)
+            self.journal_layout(self.relayout_lanes([new_event]))
 
             self.update_display()
             dialog.close()
@@ -929,8 +2922,7 @@ class EventTreeApp(QMainWindow):
                 raise ValueError("Название события не может быть пустым")
             
             selected.name = name
-            delta = datetime.timedelta.min
-            
+
             if date_type.currentIndex() == 0:
                 date = date_entry.date().toPyDate()
             else:
@@ -948,18 +2940,11 @@ class EventTreeApp(QMainWindow):
             if date < previous_max_date:
                 raise ValueError("Дата должна быть позже предыдущего события")
 
-            delta = date - selected.date
-            selected.category = category_entry.text() or nocategory()
+            self.set_node_category(selected, category_entry.text() or nocategory())
 
-            next_nodes = set()
-            self.collect_next_nodes(selected, next_nodes)
-            next_nodes.add(selected)
-
-            for node in next_nodes:
-                node.date = node.date + delta
-                x = self.calculate_date_x_position(node.date)
-                current_y = self.node_positions[node][1]
-                self.node_positions[node] = (x, current_y)
+            changed = self.reschedule_event(selected, date)
+            self.journal_record('edit', selected.id, selected.name, selected.category, [(node.id, node.date.toordinal(), x) for node, x in changed])
+            self.journal_layout(self.relayout_lanes([node for node, x in changed]))
 
             self.update_display()
             dialog.close()
@@ -970,9 +2955,11 @@ class EventTreeApp(QMainWindow):
     def delete_event(self):
         selected = self.selected_node
         if selected:
-            self.graph.remove_node(selected)
-            if selected in self.node_positions:
-                del self.node_positions[selected]
+            neighbours = list(networkx.all_neighbors(self.graph, selected))
+            self.remove_graph_node(selected)
+            self.remove_node_position(selected)
+            self.journal_record('delete', selected.id)
+            self.journal_layout(self.relayout_lanes([selected, *neighbours]))
             self.selected_node = None
             self.update_display()
 
@@ -986,13 +2973,40 @@ class EventTreeApp(QMainWindow):
         dialog.setWindowTitle("Связать события")
         layout = QVBoxLayout(dialog)
 
+        model = EventListModel((node for node in self.graph.nodes if node is not self.selected_node), dialog)
+        days = model.day_range() or (datetime.date.today().toordinal(),) * 2
+
+        layout.addWidget(QLabel("Поиск по началу названия:"))
+        search_entry = QLineEdit()
+        layout.addWidget(search_entry)
+
+        range_layout = QHBoxLayout()
+        range_layout.addWidget(QLabel("Даты с"))
+        first_entry = QDateEdit(calendarPopup=True)
+        first_entry.setDate(datetime.date.fromordinal(days[0]))
+        first_entry.setDisplayFormat("dd.MM.yyyy")
+        range_layout.addWidget(first_entry)
+        range_layout.addWidget(QLabel("по"))
+        last_entry = QDateEdit(calendarPopup=True)
+        last_entry.setDate(datetime.date.fromordinal(days[1]))
+        last_entry.setDisplayFormat("dd.MM.yyyy")
+        range_layout.addWidget(last_entry)
+        layout.addLayout(range_layout)
+
         layout.addWidget(QLabel("Выберите событие для связи:"))
-        event_list = QListWidget()
-        for node in self.graph.nodes:
-            if node != self.selected_node:
-                event_list.addItem(f"{node.name} ({node.date.strftime('%d.%m.%Y')})")
+        event_list = QListView()
+        event_list.setUniformItemSizes(True)
+        event_list.setLayoutMode(QListView.Batched)
+        event_list.setModel(model)
         layout.addWidget(event_list)
 
+        def narrow():
+            model.narrow(search_entry.text(), first_entry.date().toPyDate().toordinal(), last_entry.date().toPyDate().toordinal())
+
+        search_entry.textChanged.connect(narrow)
+        first_entry.dateChanged.connect(narrow)
+        last_entry.dateChanged.connect(narrow)
+
         button = QPushButton("Связать")
         button.clicked.connect(lambda: self.link_events_click(event_list, dialog))
         layout.addWidget(button)
@@ -1000,22 +3014,27 @@ class EventTreeApp(QMainWindow):
         dialog.exec_()
 
     def link_events_click(self, event_list, dialog):
-        selected_item = event_list.currentItem()
-        if not selected_item:
+        selected_index = event_list.currentIndex()
+        if not selected_index.isValid():
             QMessageBox.warning(self, "Внимание", "Сначала выберите событие!")
             return
 
-        selected_splited_text = selected_item.text().split(" (")
-        selected_event_name = selected_splited_text[0]
-        selected_event_date = (selected_splited_text[1].split(")")[0])
-        selected_event = next((n for n in self.graph.nodes if n.name == selected_event_name and n.date.strftime("%d.%m.%Y") == selected_event_date), None)
+        selected_event = self.node_ids.get(event_list.model().event_id(selected_index))
 
         if selected_event:
             if self.selected_node.date <= selected_event.date:
-                self.graph.add_edge(self.selected_node, selected_event)
+                source, target = self.selected_node, selected_event
             else:
-                self.graph.add_edge(selected_event, self.selected_node)
+                source, target = selected_event, self.selected_node
+
+            if not self.add_graph_edge(source, target):
+                QMessageBox.warning(self, "Ошибка", "Связь создаст цикл между событиями!")
+                return
 
+            self.journal_link(source, target)
+            self.journal_layout(self.relayout_lanes([source, target]))
+
+            self.mark_dirty(self.selected_node, selected_event)
             self.update_display()
             dialog.close()
         else:
@@ -1026,28 +3045,31 @@ class EventTreeApp(QMainWindow):
             QMessageBox.warning(self, "Внимание", "Сначала выберите событие!")
             return
 
-        self.graph.remove_node(self.selected_node)
+        neighbours = list(networkx.all_neighbors(self.graph, self.selected_node))
+        self.remove_graph_node(self.selected_node)
         position = (0, 0)
         
         if self.selected_node in self.node_positions:
             position = self.node_positions[self.selected_node]
-            del self.node_positions[self.selected_node]
+            self.remove_node_position(self.selected_node)
         
         self.update_display()
 
-        self.graph.add_node(self.selected_node)
-        self.node_positions[self.selected_node] = position
+        self.add_graph_node(self.selected_node)
+        self.set_node_position(self.selected_node, position)
+        self.journal_record('unlink', self.selected_node.id)
+        self.journal_layout(self.relayout_lanes([self.selected_node, *neighbours]))
 
         self.update_display()
 
     def filter_by_category(self):
-        categories = list(set(n.category for n in self.graph.nodes))
+        counts = self.categories.counts()
         dialog = QDialog(self)
         dialog.setMinimumSize(500,300)
         dialog.setWindowTitle("Фильтр по категориям")
         layout = QVBoxLayout(dialog)
 
-        selected_vars = {cat: QCheckBox(cat) for cat in categories}
+        selected_vars = {cat: QCheckBox(f"{cat} ({count})") for cat, count in sorted(counts.items())}
         for cat, checkbox in selected_vars.items():
             checkbox.setChecked(cat in self.current_category_filter)
             layout.addWidget(checkbox)
@@ -1060,6 +3082,7 @@ class EventTreeApp(QMainWindow):
 
     def filter_by_category_click(self, selected_vars, dialog):
         self.current_category_filter = [cat for cat, checkbox in selected_vars.items() if checkbox.isChecked()]
+        self.current_node_filter = None
         dialog.close()
         self.update_display()
 
@@ -1068,17 +3091,36 @@ class EventTreeApp(QMainWindow):
             QMessageBox.warning(self, "Внимание", "Нет событий для экспорта!")
             return
 
-        df = pandas.DataFrame([(n.name, n.date.strftime("%d.%m.%Y"), n.category) for n in self.get_filtered_nodes()], columns=["Событие", "Дата", "Категория"])
+        if self.excel_export:
+            QMessageBox.warning(self, "Внимание", "Экспорт в Excel уже выполняется!")
+            return
+
         filename, _ = QFileDialog.getSaveFileName(self, "Экспорт в Excel", "", "Excel файлы (*.xlsx)")
 
         if filename:
-            df.to_excel(filename, index=False)
-            QMessageBox.information(self, "Успех", f"Данные экспортированы в {filename}")
+            with self.profiler.measure('export_excel'):
+                self.excel_export = self.export_pool.submit(write_excel_workbook, filename, self.excel_columns())
+            self.excel_filename = filename
+            self.excel_timer.start()
+
+    def check_excel_export(self):
+        if not self.excel_export.done():
+            return
+
+        self.excel_timer.stop()
+        error = self.excel_export.exception()
+        self.excel_export = None
+
+        if error:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось экспортировать данные: {str(error)}")
+        else:
+            QMessageBox.information(self, "Успех", f"Данные экспортированы в {self.excel_filename}")
 
     def export_to_image(self):
         filename, _ = QFileDialog.getSaveFileName(self, "Экспорт в изображение", "", "PNG файлы (*.png)")
         if filename:
-            self.figure.savefig(filename, bbox_inches='tight', dpi=150)
+            with self.profiler.measure('export_image'):
+                self.write_image(filename)
             QMessageBox.information(self, "Успех", f"Изображение сохранено в {filename}")
 
     def export_to_pdf(self):
@@ -1088,16 +3130,45 @@ class EventTreeApp(QMainWindow):
 
         filename, _ = QFileDialog.getSaveFileName(self, "Экспорт в PDF", "", "PDF файлы (*.pdf)")
         if filename:
-            with PdfPages(filename) as pdf:
-                self.figure.savefig(pdf, format='pdf', bbox_inches='tight')
+            with self.profiler.measure('export_pdf'):
+                self.write_pdf(filename)
             QMessageBox.information(self, "Успех", f"PDF документ сохранен в {filename}")
 
 
-# help methods
-    def get_filtered_nodes(self):
-        return [n for n in self.graph.nodes if
-                not self.current_category_filter or n.category in self.current_category_filter]
+# journal
+    def journal_record(self, operation, *values):
+        if self.journal:
+            self.journal.append(operation, *values)
+
+    def journal_link(self, source, target):
+        self.journal_record('link', source.id, target.id, self.graph.edges[source, target]['lag'])
+
+    def journal_layout(self, positions):
+        if positions:
+            self.journal_record('layout', [[node.id, x, y] for node, (x, y) in positions.items()])
+
+    def compact_journal(self):
+        if not self.journal or not self.journal.records or (self.compaction and self.compaction.is_alive()):
+            return
+
+        self.journal.rotate()
+        self.compaction = threading.Thread(target=compact_project, args=(self.project_path,), daemon=True)
+        self.compaction.start()
+
+    def wait_compaction(self):
+        if self.compaction:
+            self.compaction.join()
+            self.compaction = None
 
+    def close_journal(self):
+        self.wait_compaction()
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+        self.project_path = None
+
+
+# help methods
     def get_selected_event(self):
         if not self.selected_node:
             QMessageBox.warning(self, "Внимание", "Сначала выберите событие!")
@@ -1105,7 +3176,10 @@ class EventTreeApp(QMainWindow):
         return next((n for n in self.graph.nodes if n.id == self.selected_node), None)
 
     def closeEvent(self, event):
-        if self.graph.nodes:
+        if self.journal:
+            self.close_journal()
+            event.accept()
+        elif self.graph.nodes:
             reply = QMessageBox.question(self, 'Сохранить проект', 'Хотите сохранить проект перед закрытием?', QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel)
             if reply == QMessageBox.Yes:
                 self.save_project()
@@ -1119,6 +3193,373 @@ class EventTreeApp(QMainWindow):
 
 
 
+# project files
+def project_magic():
+    return b'SMEV'
+
+def project_version():
+    return 3
+
+def read_pickle_project(path):
+    with open(path, 'rb') as f:
+        data = pickle.load(f)
+
+    if data.get('version', 1) < 2:
+        scale = data.get('current_scale', 1.0)
+        xlim = data.get('current_xlim', (-0.9, 0.9))
+        ylim = data.get('current_ylim', (-0.7, 0.7))
+        data['positions'] = {node: (x / scale, y / scale) for node, (x, y) in data.get('positions', {}).items()}
+        data['current_xlim'] = (xlim[0] / scale, xlim[1] / scale)
+        data['current_ylim'] = (ylim[0] / scale, ylim[1] / scale)
+
+    return data
+
+def string_table(strings):
+    encoded = [string.encode('utf-8') for string in strings]
+    offsets = numpy.zeros(len(encoded) + 1, dtype=numpy.int64)
+    numpy.cumsum([len(string) for string in encoded], out=offsets[1:])
+    return offsets, numpy.frombuffer(b''.join(encoded), dtype=numpy.uint8)
+
+def read_string_table(offsets, blob):
+    text = blob.tobytes().decode('utf-8')
+    continuations = numpy.zeros(len(blob) + 1, dtype=numpy.int64)
+    numpy.cumsum((blob & 0xC0) == 0x80, out=continuations[1:])
+    bounds = (offsets - continuations[offsets]).tolist()
+    return [text[start:end] for start, end in zip(bounds, bounds[1:])]
+
+def write_project_file(path, data):
+    graph = data['graph']
+    nodes = list(graph.nodes)
+    rows = {node: i for i, node in enumerate(nodes)}
+    start = data['project_start']
+
+    categories = sorted({node.category for node in nodes})
+    category_codes = {category: i for i, category in enumerate(categories)}
+    name_offsets, name_blob = string_table(node.name for node in nodes)
+    category_offsets, category_blob = string_table(categories)
+
+    positions = data.get('positions', {})
+    edges = [(rows[source], rows[target], lag if lag is not None else (target.date - source.date).days) for source, target, lag in graph.edges(data='lag')]
+    edges = numpy.array(edges, dtype=numpy.int32).reshape(-1, 3)
+
+    arrays = {
+        'ids': numpy.array([node.id for node in nodes], dtype=numpy.int64),
+        'name_offsets': name_offsets,
+        'names': name_blob,
+        'category_offsets': category_offsets,
+        'categories': category_blob,
+        'category_codes': numpy.array([category_codes[node.category] for node in nodes], dtype=numpy.int32),
+        'days': numpy.array([(node.date - start).days for node in nodes], dtype=numpy.int32),
+        'positions': numpy.array([positions.get(node, (numpy.nan, numpy.nan)) for node in nodes], dtype=numpy.float32).reshape(-1, 2),
+        'edge_sources': numpy.ascontiguousarray(edges[:, 0]),
+        'edge_targets': numpy.ascontiguousarray(edges[:, 1]),
+        'edge_lags': numpy.ascontiguousarray(edges[:, 2]),
+    }
+
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = (array.dtype.str, array.shape, offset)
+        offset += -(-array.nbytes // 8) * 8
+
+    header = json.dumps({
+        'project_start': start.isoformat(),
+        'project_end': data['project_end'].isoformat(),
+        'filter': list(data.get('filter', [])),
+        'current_scale': data.get('current_scale', 1.0),
+        'current_week_offset': data.get('current_week_offset', 0),
+        'current_xlim': list(data.get('current_xlim', (-0.9, 0.9))),
+        'current_ylim': list(data.get('current_ylim', (-0.7, 0.7))),
+        'column_width_base': data.get('column_width_base', "8.0"),
+        'granularity': data.get('granularity', 'week'),
+        'sequence': data.get('sequence', 0),
+        'arrays': layout,
+    }).encode('utf-8')
+    header += b' ' * (-(len(header) + 16) % 8)
+
+    with open(path, 'wb') as f:
+        f.write(project_magic())
+        f.write(struct.pack('<IQ', project_version(), len(header)))
+        f.write(header)
+        for array in arrays.values():
+            f.write(array.tobytes())
+            f.write(b'\0' * (-array.nbytes % 8))
+
+def journal_path(path):
+    return path + '.journal'
+
+def compacting_journal_path(path):
+    return path + '.journal.compacting'
+
+def read_journal(path):
+    records = []
+    if not os.path.exists(path):
+        return records
+
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+
+    return records
+
+def apply_journal(data, records):
+    graph = data['graph']
+    positions = data['positions']
+    nodes = {node.id: node for node in graph}
+
+    for sequence, operation, *values in records:
+        if sequence <= data.get('sequence', 0):
+            continue
+
+        if operation == 'add':
+            node_id, name, day, category, position = values
+            node = EventNode(name, datetime.date.fromordinal(day), category)
+            node.id = node_id
+            nodes[node_id] = node
+            graph.add_node(node)
+            if position is not None:
+                positions[node] = tuple(position)
+        elif operation == 'edit':
+            node_id, name, category, changes = values
+            node = nodes[node_id]
+            node.name = name
+            node.category = category
+            for changed_id, day, x in changes:
+                changed = nodes[changed_id]
+                changed.date = datetime.date.fromordinal(day)
+                if changed in positions:
+                    positions[changed] = (x, positions[changed][1])
+            for predecessor, attributes in graph.pred[node].items():
+                attributes['lag'] = (node.date - predecessor.date).days
+        elif operation == 'delete':
+            node = nodes.pop(values[0])
+            graph.remove_node(node)
+            positions.pop(node, None)
+        elif operation == 'link':
+            source_id, target_id, lag = values
+            graph.add_edge(nodes[source_id], nodes[target_id], lag=lag)
+        elif operation == 'unlink':
+            node = nodes[values[0]]
+            graph.remove_edges_from(list(graph.in_edges(node)) + list(graph.out_edges(node)))
+        elif operation == 'move':
+            node_id, x, y = values
+            positions[nodes[node_id]] = (x, y)
+        elif operation == 'layout':
+            for node_id, x, y in values[0]:
+                positions[nodes[node_id]] = (x, y)
+        elif operation == 'project':
+            previous = Calendar(data['project_start'], data['project_end'], data.get('granularity', 'week'))
+            previous_width = float(data['column_width_base']) / len(previous)
+            data['project_start'] = datetime.date.fromisoformat(values[0])
+            data['project_end'] = datetime.date.fromisoformat(values[1])
+            data['column_width_base'] = values[2]
+            data['granularity'] = values[3] if len(values) > 3 else 'week'
+
+            calendar = Calendar(data['project_start'], data['project_end'], data['granularity'])
+            positions.update(calendar_positions(positions, previous, previous_width, calendar, float(data['column_width_base']) / len(calendar)))
+
+        data['sequence'] = sequence
+
+    return data
+
+def read_project_with_journal(path):
+    records = read_journal(compacting_journal_path(path)) + read_journal(journal_path(path))
+    return apply_journal(read_project_file(path), records), len(records)
+
+def compact_project(path):
+    compacting_path = compacting_journal_path(path)
+    data = apply_journal(read_project_file(path), read_journal(compacting_path))
+    write_project_file(path + '.tmp', data)
+    os.replace(path + '.tmp', path)
+    os.remove(compacting_path)
+
+def dependency_graph(nodes, sources, targets, lags):
+    graph = networkx.DiGraph()
+    graph._node.update((node, {}) for node in nodes)
+    successors, predecessors = graph._succ, graph._pred
+    successors.update((node, {}) for node in nodes)
+    predecessors.update((node, {}) for node in nodes)
+
+    for source, target, lag in zip(sources, targets, lags):
+        successors[source][target] = predecessors[target][source] = {'lag': lag}
+
+    return graph
+
+def read_project_file(path):
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        return decode_project(buffer)
+    finally:
+        buffer.close()
+        if collecting:
+            gc.enable()
+
+def decode_project(buffer):
+    if buffer[:4] != project_magic():
+        raise ValueError("Файл не является проектом SmartEvent")
+
+    version, header_length = struct.unpack_from('<IQ', buffer, 4)
+    if version > project_version():
+        raise ValueError("Проект сохранен в более новой версии программы")
+
+    header = json.loads(bytes(buffer[16:16 + header_length]))
+    base = 16 + header_length
+    arrays = {name: numpy.frombuffer(buffer, dtype=dtype, count=math.prod(shape), offset=base + offset).reshape(shape) for name, (dtype, shape, offset) in header['arrays'].items()}
+
+    start = datetime.date.fromisoformat(header['project_start'])
+    names = read_string_table(arrays['name_offsets'], arrays['names'])
+    categories = read_string_table(arrays['category_offsets'], arrays['categories'])
+    dates = (numpy.datetime64(start, 'D') + arrays['days']).tolist()
+
+    nodes = [EventNode.__new__(EventNode) for _ in names]
+    for node, node_id, name, category, date in zip(nodes, arrays['ids'].tolist(), names, (categories[code] for code in arrays['category_codes'].tolist()), dates):
+        node.id = node_id
+        node.name = name
+        node.date = date
+        node.category = category
+
+    node_array = numpy.empty(len(nodes), dtype=object)
+    node_array[:] = nodes
+    graph = dependency_graph(nodes, node_array[arrays['edge_sources']].tolist(), node_array[arrays['edge_targets']].tolist(), arrays['edge_lags'].tolist())
+
+    placed = ~numpy.isnan(arrays['positions'][:, 0])
+    positions = dict(zip(node_array[placed].tolist(), zip(arrays['positions'][placed, 0].tolist(), arrays['positions'][placed, 1].tolist())))
+    del arrays
+
+    return {
+        'version': version,
+        'graph': graph,
+        'positions': positions,
+        'filter': header['filter'],
+        'project_start': start,
+        'project_end': datetime.date.fromisoformat(header['project_end']),
+        'current_scale': header['current_scale'],
+        'current_week_offset': header['current_week_offset'],
+        'current_xlim': tuple(header['current_xlim']),
+        'current_ylim': tuple(header['current_ylim']),
+        'column_width_base': header['column_width_base'],
+        'granularity': header.get('granularity', 'week'),
+        'sequence': header.get('sequence', 0),
+    }
+
+
+
+# excel export
+def excel_date_format():
+    return 'DD.MM.YYYY'
+
+def write_excel_workbook(filename, columns):
+    workbook = openpyxl.Workbook(write_only=True)
+    ids, names = columns['ids'].tolist(), columns['names']
+    dates = columns['dates'].astype(datetime.date).tolist()
+
+    def date_cell(sheet, value):
+        cell = WriteOnlyCell(sheet, value)
+        cell.number_format = excel_date_format()
+        return cell
+
+    events = workbook.create_sheet("События")
+    events.append(["Событие", "Дата", "Категория", "ID"])
+    for name, date, category, node_id in zip(names, dates, columns['categories'], ids):
+        events.append([name, date_cell(events, date), category, str(node_id)])
+
+    dependencies = workbook.create_sheet("Зависимости")
+    dependencies.append(["Предшественник", "ID предшественника", "Последователь", "ID последователя", "Задержка, дн."])
+    for source, target, lag in zip(columns['edge_sources'].tolist(), columns['edge_targets'].tolist(), columns['edge_lags'].tolist()):
+        dependencies.append([names[source], str(ids[source]), names[target], str(ids[target]), lag])
+
+    computed = workbook.create_sheet("Расчёт")
+    computed.append(["Событие", "ID", "Неделя", "Ранний срок", "Поздний срок", "Резерв, дн.", "Критическое"])
+    for name, node_id, week, earliest, latest in zip(names, ids, columns['weeks'].tolist(), columns['earliest'].tolist(), columns['latest'].tolist()):
+        computed.append([name, str(node_id), week, date_cell(computed, datetime.date.fromordinal(earliest)), date_cell(computed, datetime.date.fromordinal(latest)), latest - earliest, "да" if latest == earliest else "нет"])
+
+    workbook.save(filename)
+
+
+# frame profile dump
+def write_profile(path, frames):
+    if path.endswith('.json'):
+        write_profile_json(path, frames)
+    else:
+        write_profile_csv(path, frames)
+
+def write_profile_csv(path, frames):
+    phases = sorted(set().union(*(frame[4] for frame in frames)))
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['time', 'frame_ms', 'artists', *phases])
+        for _, moment, busy, artists, frame_phases in frames:
+            writer.writerow([profile_time(moment), round(busy, 3), artists, *(round(frame_phases.get(phase, 0.0), 3) for phase in phases)])
+
+def write_profile_json(path, frames):
+    records = [{'time': profile_time(moment), 'frame_ms': round(busy, 3), 'artists': artists, 'phases': {phase: round(duration, 3) for phase, duration in frame_phases.items()}}
+               for _, moment, busy, artists, frame_phases in frames]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(records, f, ensure_ascii=False, indent=1)
+
+def profile_time(moment):
+    return datetime.datetime.fromtimestamp(moment).isoformat(timespec='milliseconds')
+
+
+# headless export
+def export_formats():
+    return ('png', 'pdf', 'xlsx')
+
+def export_project(path, formats, output_dir=None):
+    start = time.perf_counter()
+    data = read_pickle_project(path) if path.endswith('.pkl') else read_project_with_journal(path)[0]
+
+    scene = EventScene()
+    scene.init_scene()
+    figure = Figure(figsize=(16, 10), dpi=100)
+    scene.setup_figure(figure, FigureCanvasAgg(figure))
+    scene.load_project(data)
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    writers = {'png': scene.write_image, 'pdf': scene.write_pdf, 'xlsx': scene.write_excel}
+    for extension in formats:
+        writers[extension](os.path.join(output_dir or os.path.dirname(path), f"{name}.{extension}"))
+
+    return time.perf_counter() - start
+
+def export_main(args):
+    parser = argparse.ArgumentParser(prog='main.py export', description='Render SmartEvent projects without the GUI.')
+    parser.add_argument('projects', nargs='+', help='.sev or .pkl project files')
+    parser.add_argument('--formats', default=','.join(export_formats()), help='comma separated list of png, pdf, xlsx')
+    parser.add_argument('--output', help='output directory, next to each project by default')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='number of worker processes')
+    options = parser.parse_args(args)
+
+    formats = options.formats.split(',')
+    unknown = set(formats) - set(export_formats())
+    if unknown:
+        parser.error(f"unknown formats: {', '.join(sorted(unknown))}")
+    if options.output:
+        os.makedirs(options.output, exist_ok=True)
+
+    start = time.perf_counter()
+    failed = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=options.jobs) as pool:
+        futures = {pool.submit(export_project, path, formats, options.output): path for path in options.projects}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                print(f"{futures[future]}: {future.result():.2f} s", flush=True)
+            except Exception as e:
+                failed += 1
+                print(f"{futures[future]}: failed: {e}", file=sys.stderr, flush=True)
+
+    print(f"exported {len(futures) - failed}/{len(futures)} projects in {time.perf_counter() - start:.2f} s")
+    return 1 if failed else 0
+
+
+
 # global help methods
 def resource_path(relative_path):
     try:
@@ -1134,10 +3575,114 @@ def icon():
 def nocategory():
     return "Без категории"
 
+def edge_routes(x1, y1, x2, y2, width1, width2):
+    head_width = 0.01
+    head_length = 0.01
+    x_offset = head_length * 2
+
+    mid_x = (x1 + x2) / 2
+    mid_y = (y1 + y2) / 2
+    start = x1 + (width1 + head_length) / 2
+    end = x2 - (width2 + head_length) / 2
+
+    detour = start + x_offset >= end - x_offset
+    xs = numpy.where(detour, [start, start + x_offset, start + x_offset, end - x_offset, end - x_offset, end], [start, mid_x, mid_x, end, end, end])
+    ys = numpy.where(detour, [y1, y1, mid_y, mid_y, y2, y2], [y1, y1, y2, y2, y2, y2])
+    routes = numpy.stack([xs.T, ys.T], axis=-1)
+
+    base = end - head_length
+    heads = numpy.stack([numpy.stack([end, y2], axis=-1), numpy.stack([base, y2 + head_width / 2], axis=-1), numpy.stack([base, y2 - head_width / 2], axis=-1)], axis=1)
+
+    return routes, heads
+
+def line_path(route):
+    return Path(numpy.asarray(route, dtype=float))
+
+def head_path(head):
+    head = numpy.asarray(head, dtype=float)
+    return Path(numpy.concatenate((head, head[:1])), closed=True)
+
+def tile_span(low, high, size, margin):
+    return range(math.floor((low - margin) / size), math.floor((high + margin) / size) + 1)
+
+def pdf_page_size():
+    return (11.69, 8.27)
+
+def pdf_tile_margin():
+    return 0.05
+
+def adjacency_slices(index, rows):
+    starts = index[rows]
+    counts = index[rows + 1] - starts
+    offsets = numpy.repeat(starts - numpy.cumsum(counts) + counts, counts)
+    return offsets + numpy.arange(counts.sum()), counts
+
+def epoch_ordinal():
+    return datetime.date(1970, 1, 1).toordinal()
+
+def node_label(node):
+    return f"{node.name}\n{node.date.strftime('%d.%m.%Y')}\n({node.category})"
+
+def dots_font_pixels():
+    return 5
+
+def names_font_pixels():
+    return 8
+
+def label_spacing():
+    return 2
+
+def node_dot_size():
+    return 4
+
+def dots_line_width():
+    return 0.3
+
+def view_bucket_width():
+    return 0.05
+
+def hit_radius():
+    return math.sqrt(0.02)
+
+def calendar_positions(positions, source, source_width, target, target_width):
+    nodes = list(positions)
+    xy = numpy.array([positions[node] for node in nodes], dtype=numpy.float64).reshape(-1, 2)
+    dates = numpy.array([node.date for node in nodes], dtype='datetime64[D]')
+
+    columns = target.columns(dates)
+    offsets = xy[:, 0] / source_width - source.columns(dates)
+    xs = numpy.clip(columns + offsets, numpy.floor(columns), numpy.floor(columns) + 1) * target_width
+    return dict(zip(nodes, zip(xs.tolist(), xy[:, 1].tolist())))
+
+def calendar_granularities():
+    return (('day', 'День'), ('week', 'Неделя'), ('month', 'Месяц'))
+
+def week_layer(node):
+    return (node.date.toordinal() - 1) // 7
+
+def lane_height():
+    return 0.1
+
+def layout_sweeps():
+    return 4
+
+def route_gap():
+    return 0.02
+
+def route_search_steps():
+    return 8
+
+def profile_capacity():
+    return 2000
+
 
 
 # entry point
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    if sys.argv[1:2] == ['export']:
+        sys.exit(export_main(sys.argv[2:]))
+
     app = QApplication(sys.argv)
     window = EventTreeApp()
     window.show()
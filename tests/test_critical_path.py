@@ -0,0 +1,54 @@
+import datetime, networkx
+
+from main import EventNode, EventScene
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+
+def chain_scene():
+    graph = networkx.DiGraph()
+    nodes = [EventNode(f"event {i}", datetime.date(2025, 1, 1) + datetime.timedelta(days=i * 10)) for i in range(3)]
+    graph.add_edge(nodes[0], nodes[1])
+    graph.add_edge(nodes[1], nodes[2])
+
+    scene = EventScene()
+    scene.init_scene()
+    figure = Figure(figsize=(8, 5), dpi=100)
+    scene.setup_figure(figure, FigureCanvasAgg(figure))
+    scene.start_entry, scene.end_entry = "01.01.2025", "31.12.2025"
+    scene.set_dates()
+    scene.reset_model(graph)
+    scene.set_node_positions({node: (scene.calculate_date_x_position(node.date), 0.0) for node in nodes})
+    scene.show_critical_path = True
+    scene.critical_path.update()
+    scene.update_display()
+    scene.flush_display()
+    return scene, nodes
+
+def test_delete_sink_with_critical_path():
+    scene, (start, middle, finish) = chain_scene()
+
+    scene.remove_graph_node(finish)
+    scene.remove_node_position(finish)
+    scene.update_display()
+    scene.flush_display()
+
+    assert finish not in scene.graph
+    assert scene.critical_path.is_critical(start) and scene.critical_path.is_critical(middle)
+    assert scene.edge_lines.edges == [(start, middle)]
+
+def test_unlink_sink_with_critical_path():
+    scene, (start, middle, finish) = chain_scene()
+
+    position = scene.node_positions[finish]
+    scene.remove_graph_node(finish)
+    scene.remove_node_position(finish)
+    scene.update_display()
+    scene.add_graph_node(finish)
+    scene.set_node_position(finish, position)
+    scene.update_display()
+    scene.flush_display()
+
+    assert scene.graph.degree(finish) == 0
+    assert scene.critical_path.is_critical(finish)
+    assert not scene.critical_path.is_critical(start)
@@ -0,0 +1,35 @@
+import os
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from main import FrameProfiler, ProfiledCanvas
+from matplotlib.figure import Figure
+from PyQt5.QtWidgets import QApplication
+
+
+application = QApplication.instance() or QApplication([])
+
+def profiled_canvas():
+    profiler = FrameProfiler(10)
+    figure = Figure(figsize=(4, 3), dpi=100)
+    figure.add_subplot(111)
+    return profiler, ProfiledCanvas(figure, profiler)
+
+def test_draw_closes_a_frame():
+    profiler, canvas = profiled_canvas()
+    canvas.draw()
+
+    assert len(profiler.frames) == 1
+    assert 'draw' in profiler.frames[0][4]
+
+def test_nested_draw_joins_enclosing_frame():
+    profiler, canvas = profiled_canvas()
+    start = profiler.start()
+    canvas.draw()
+    profiler.stop('motion', start)
+    profiler.end_frame(canvas.artist_count())
+
+    assert len(profiler.frames) == 1
+    _, _, busy, _, phases = profiler.frames[0]
+    assert set(phases) == {'draw', 'motion'}
+    assert busy >= phases['draw']